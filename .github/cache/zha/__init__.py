@@ -2,22 +2,44 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import asyncio
+import collections
+from collections.abc import Awaitable, Callable, Iterable
 import dataclasses
 import datetime
 import enum
+import functools
+import heapq
+import io
+import itertools
+import json
 import logging
+import math
+import operator
+import os
+import pathlib
+import struct
+import time
 from typing import Any, Final
+import weakref
 
+import zigpy.exceptions
 import zigpy.types as t
 from zigpy.typing import UNDEFINED, AddressingMode, UndefinedType
-from zigpy.zcl import BaseAttributeDefs, foundation
+from zigpy.zcl import (
+    AttributeUpdatedEvent,
+    BaseAttributeDefs,
+    Cluster,
+    ClusterType,
+    foundation,
+)
 from zigpy.zcl.clusters.closures import WindowCovering
 from zigpy.zcl.clusters.general import Basic, LevelControl, OnOff, PowerConfiguration
 from zigpy.zcl.clusters.homeautomation import ElectricalMeasurement
 from zigpy.zcl.clusters.hvac import Thermostat, UserInterface
 from zigpy.zcl.clusters.smartenergy import Metering
 from zigpy.zcl.foundation import BaseCommandDefs, ZCLAttributeDef
+import zigpy.zdo.types as zdo_t
 
 from zhaquirks import Bus, EventableCluster, LocalDataCluster
 from zhaquirks.clusters import CustomCluster
@@ -56,6 +78,9 @@ TUYA_MCU_VERSION_REQ = 0x10
 TUYA_MCU_VERSION_RSP = 0x11
 TUYA_LEVEL_COMMAND = 514
 
+# Largest APS payload sent without fragmentation, including the ZCL header
+TUYA_MAX_APS_PAYLOAD = 82
+
 LEVEL_EVENT = "level_event"
 TUYA_MCU_COMMAND = "tuya_mcu_command"
 
@@ -151,6 +176,54 @@ class TuyaDPType(t.enum8):
     BITMAP = 0x05
 
 
+def _decode_value(raw: bytes) -> t.int32s_be:
+    if len(raw) < 4:
+        raise ValueError(f"Data is too short to contain a value: {raw!r}")
+    return t.int32s_be(int.from_bytes(raw[:4], "big", signed=True))
+
+
+def _decode_bool(raw: bytes) -> t.Bool:
+    if not raw:
+        raise ValueError("Data is too short to contain a bool")
+    return t.Bool(raw[0])
+
+
+def _decode_string(raw: bytes) -> t.CharacterString:
+    return t.CharacterString(raw.decode("utf8"))
+
+
+def _decode_enum(raw: bytes) -> t.enum8:
+    if not raw:
+        raise ValueError("Data is too short to contain an enum")
+    return t.enum8(raw[0])
+
+
+_BITMAP_TYPES: Final = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
+
+
+def _decode_bitmap(raw: bytes) -> t.bitmap8 | t.bitmap16 | t.bitmap32:
+    try:
+        bitmap_type = _BITMAP_TYPES[len(raw)]
+    except KeyError as exc:
+        raise ValueError(f"Wrong bitmap length: {len(raw)}") from exc
+    return bitmap_type(int.from_bytes(raw, "little"))
+
+
+def _decode_raw(raw: bytes) -> bytes:
+    return raw
+
+
+# Payload decoder for each datapoint type
+_PAYLOAD_DECODERS: Final[dict[TuyaDPType, Callable[[bytes], Any]]] = {
+    TuyaDPType.RAW: _decode_raw,
+    TuyaDPType.BOOL: _decode_bool,
+    TuyaDPType.VALUE: _decode_value,
+    TuyaDPType.STRING: _decode_string,
+    TuyaDPType.ENUM: _decode_enum,
+    TuyaDPType.BITMAP: _decode_bitmap,
+}
+
+
 class TuyaData:
     """Tuya Data type."""
 
@@ -186,6 +259,17 @@ class TuyaData:
 
         self.payload = value
 
+    @property
+    def raw(self) -> t.LVBytes:
+        """Raw value of the data point."""
+        return self._raw
+
+    @raw.setter
+    def raw(self, value: bytes) -> None:
+        """Set raw value and drop the decoded payload."""
+        self._raw = value
+        self._payload = UNDEFINED
+
     @property
     def payload(
         self,
@@ -199,25 +283,18 @@ class TuyaData:
         | t.bitmap32
         | t.LVBytes
     ):
-        """Payload accordingly to data point type."""
-        if self.dp_type == TuyaDPType.VALUE:
-            return t.int32s_be.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.BOOL:
-            return t.Bool.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.STRING:
-            return t.CharacterString(self.raw.decode("utf8"))
-        elif self.dp_type == TuyaDPType.ENUM:
-            return t.enum8.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.BITMAP:
-            bitmaps = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
-            try:
-                return bitmaps[len(self.raw)].deserialize(self.raw)[0]
-            except KeyError as exc:
-                raise ValueError(f"Wrong bitmap length: {len(self.raw)}") from exc
-        elif self.dp_type == TuyaDPType.RAW:
-            return self.raw
-        else:
-            raise ValueError(f"Unknown {self.dp_type} datapoint type")
+        """Payload accordingly to data point type, decoded once."""
+        if self._payload is not UNDEFINED and self._payload_type is self.dp_type:
+            return self._payload
+
+        try:
+            decoder = _PAYLOAD_DECODERS[self.dp_type]
+        except KeyError as exc:
+            raise ValueError(f"Unknown {self.dp_type} datapoint type") from exc
+
+        self._payload = decoder(self.raw)
+        self._payload_type = self.dp_type
+        return self._payload
 
     @payload.setter
     def payload(self, value):
@@ -263,47 +340,134 @@ class TuyaData:
         return instance, data
 
 
-class Data(t.List, item_type=t.uint8_t):
-    """list of uint8_t."""
+# Interned zigpy values for the single byte fields of a datapoint record
+_UINT8_VALUES: Final = tuple(t.uint8_t(i) for i in range(256))
+_DP_TYPES: Final = {dp_type.value: dp_type for dp_type in TuyaDPType}
+
+
+class TuyaDataView(TuyaData):
+    """Tuya Data type backed by a view into the received frame.
+
+    Only the offset of the value is kept when the frame is decoded, ``raw`` is
+    copied out of the frame (and ``payload`` decoded) when they are first read.
+    """
+
+    def __init__(
+        self,
+        buffer: memoryview,
+        offset: int,
+        length: int,
+        dp_type: TuyaDPType,
+        function: t.uint8_t,
+    ):
+        """Init a lazy view over `length` bytes at `offset` of `buffer`."""
+        self._buffer = buffer
+        self._offset = offset
+        self._length = length
+        self._raw = None
+        self._payload = UNDEFINED
+        self.dp_type = dp_type
+        self.function = function
+
+    @TuyaData.raw.getter
+    def raw(self) -> t.LVBytes:
+        """Raw value, copied out of the frame on first access."""
+        if self._raw is None:
+            self._raw = t.LVBytes(
+                self._buffer[self._offset : self._offset + self._length]
+            )
+        return self._raw
+
+
+def deserialize_datapoints(data: bytes, offset: int = 0) -> list[TuyaDatapointData]:
+    """Decode all datapoint records of a frame in a single pass.
 
-    def __init__(self, value=None):
+    Records hold a lazy `TuyaDataView` into `data` instead of copies of it.
+    """
+    buffer = memoryview(data)
+    end = len(buffer)
+    records = []
+
+    while offset < end:
+        if offset + 4 > end:
+            raise ValueError(f"Data is too short to contain a datapoint: {data!r}")
+
+        dp, dp_type, function, length = buffer[offset : offset + 4]
+        offset += 4
+        if offset + length > end:
+            raise ValueError(f"Data is too short to contain {length} bytes: {data!r}")
+
+        try:
+            dp_type = _DP_TYPES[dp_type]
+        except KeyError:
+            dp_type = TuyaDPType(dp_type)
+
+        # bypass the Struct constructor, fields are already of the right type
+        record = object.__new__(TuyaDatapointData)
+        record.dp = _UINT8_VALUES[dp]
+        record.data = TuyaDataView(
+            buffer, offset, length, dp_type, _UINT8_VALUES[function]
+        )
+        records.append(record)
+        offset += length
+
+    return records
+
+
+def pack_datapoints(
+    datapoints: list[TuyaDatapointData], budget: int
+) -> list[list[TuyaDatapointData]]:
+    """Split datapoints in batches whose records fit in `budget` bytes each.
+
+    A datapoint larger than `budget` is sent alone in its batch.
+    """
+    batches: list[list[TuyaDatapointData]] = []
+    batch_size = budget
+    for datapoint in datapoints:
+        # dp, type, function and length bytes before the value
+        size = 4 + len(datapoint.data.raw)
+        if batch_size + size > budget:
+            batches.append([])
+            batch_size = 0
+        batches[-1].append(datapoint)
+        batch_size += size
+    return batches
+
+
+class Data(bytes):
+    """Tuya data payload: length prefixed, big endian value bytes."""
+
+    def __new__(cls, value=None):
         """Convert from a zigpy typed value to a tuya data payload."""
         if value is None:
-            super().__init__()
-            return
+            return super().__new__(cls)
         if type(value) is list or type(value) is bytes:  # noqa: E721
-            super().__init__(value)
-            return
-        # serialized in little-endian by zigpy
-        super().__init__(value.serialize())
-        # we want big-endian, with length prepended
-        self.append(len(self))
-        self.reverse()
+            return super().__new__(cls, value)
+        # serialized in little-endian by zigpy, we want big-endian with the
+        # length prepended
+        raw = value.serialize()
+        return super().__new__(cls, bytes([len(raw)]) + raw[::-1])
 
     def __int__(self):
         """Convert from a tuya data payload to an int typed value."""
-        # first uint8_t is the length of the remaining data
-        # tuya data is in big endian whereas ztypes use little endian
-        ints = {
-            1: t.int8s,
-            2: t.int16s,
-            3: t.int24s,
-            4: t.int32s,
-            5: t.int40s,
-            6: t.int48s,
-            7: t.int56s,
-            8: t.int64s,
-        }
-        return ints[self[0]].deserialize(bytes(reversed(self[1:])))[0]
+        # first byte is the length of the value, made of the last bytes
+        length = self[0] if self else 0
+        if not 1 <= length <= 8 or len(self) <= length:
+            raise ValueError(f"Data is too short to contain an int: {self!r}")
+        return int.from_bytes(self[len(self) - length :], "big", signed=True)
 
     def __iter__(self):
         """Convert from a tuya data payload to a list typed value."""
-        return iter(reversed(self[1:]))
+        return iter(self[:0:-1])
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> tuple[Data, bytes]:
+        """Deserialize the payload, it always consumes the remaining data."""
+        return cls(bytes(data)), b""
 
     def serialize(self) -> bytes:
-        """Overload serialize to avoid prior implicit conversion to list."""
-        assert self._item_type is not None
-        return b"".join([self._item_type(i).serialize() for i in self[:]])
+        """Serialize the payload as is."""
+        return bytes(self)
 
 
 class TuyaDatapointData(t.Struct):
@@ -320,6 +484,22 @@ class TuyaCommand(t.Struct):
     tsn: t.uint8_t
     datapoints: t.List[TuyaDatapointData]
 
+    @classmethod
+    def deserialize(cls, data: bytes) -> tuple[TuyaCommand, bytes]:
+        """Deserialize Tuya command, decoding datapoints lazily from the frame."""
+        if len(data) < 2:
+            raise ValueError(f"Data is too short to contain a Tuya command: {data!r}")
+
+        instance = object.__new__(cls)
+        instance.status = _UINT8_VALUES[data[0]]
+        instance.tsn = _UINT8_VALUES[data[1]]
+        instance.datapoints = cls.fields.datapoints.type(
+            deserialize_datapoints(data, 2)
+        )
+
+        # datapoints always consume the remaining data
+        return instance, b""
+
 
 class Command(t.Struct):
     """Tuya manufacturer cluster command."""
@@ -330,6 +510,22 @@ class Command(t.Struct):
     function: t.uint8_t
     data: Data
 
+    @classmethod
+    def deserialize(cls, data: bytes) -> tuple[Command, bytes]:
+        """Deserialize Tuya command without the generic Struct machinery."""
+        if len(data) < 5:
+            raise ValueError(f"Data is too short to contain a Tuya command: {data!r}")
+
+        instance = object.__new__(cls)
+        instance.status = _UINT8_VALUES[data[0]]
+        instance.tsn = _UINT8_VALUES[data[1]]
+        instance.command_id = t.uint16_t(data[2] | data[3] << 8)
+        instance.function = _UINT8_VALUES[data[4]]
+        instance.data = Data(bytes(data[5:]))
+
+        # data always consumes the remaining data
+        return instance, b""
+
 
 class MCUVersionRsp(t.Struct):
     """Tuya MCU version response Zcl payload."""
@@ -338,6 +534,1057 @@ class MCUVersionRsp(t.Struct):
     version: t.uint8_t
 
 
+class TuyaWriteQueue:
+    """Per device queue of datapoint writes to the Tuya MCU.
+
+    Writes with the same key queued within `window` seconds are coalesced, only
+    the last one is sent. Keys are tuples starting with the kind of write, e.g.
+    `("command", command_id)` for legacy MCU commands and `("dp", dps)` for the
+    datapoints of a set_data frame, so both kinds never collide. At most
+    `max_in_flight` frames are sent to the device concurrently.
+    """
+
+    def __init__(self, window: float = 0.0, max_in_flight: int = 4) -> None:
+        """Init queue."""
+        self.window = window
+        self.max_in_flight = max_in_flight
+        self.coalesced = 0
+        self.sent = 0
+        self._pending: dict[
+            tuple, tuple[CustomCluster, Callable[[], Awaitable], asyncio.Future]
+        ] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @classmethod
+    def for_cluster(cls, cluster: CustomCluster) -> TuyaWriteQueue:
+        """Return the write queue of the cluster's device, creating it if needed.
+
+        The queue is shared by all clusters of a device and is configured by the
+        `tuya_write_window` and `tuya_max_in_flight` of the first cluster using it.
+        """
+        device = cluster.endpoint.device
+        queue = getattr(device, "tuya_write_queue", None)
+        if queue is None:
+            queue = cls(cluster.tuya_write_window, cluster.tuya_max_in_flight)
+            device.tuya_write_queue = queue
+        return queue
+
+    @property
+    def pending(self) -> int:
+        """Number of writes waiting for the coalescing window to elapse."""
+        return len(self._pending)
+
+    def write(
+        self, cluster: CustomCluster, key: tuple, send: Callable[[], Awaitable]
+    ) -> asyncio.Future:
+        """Queue `send` as the latest write of `key`.
+
+        Return a future with the result of the write which is eventually sent
+        for `key`, shared with the writes it supersedes.
+        """
+        loop = asyncio.get_running_loop()
+        if key in self._pending:
+            self.coalesced += 1
+            future = self._pending[key][2]
+        else:
+            future = loop.create_future()
+        self._pending[key] = (cluster, send, future)
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        """Send all pending writes."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for cluster, send, future in pending.values():
+            cluster.create_catching_task(self._send(send, future))
+
+    async def _send(
+        self, send: Callable[[], Awaitable], future: asyncio.Future
+    ) -> None:
+        """Send a write, waiting for a free in-flight slot."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        try:
+            async with self._semaphore:
+                self.sent += 1
+                result = await send()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+                # retrieved here, the catching task logs it for unawaited writes
+                future.exception()
+            raise
+        if not future.done():
+            future.set_result(result)
+
+
+class TuyaTimeSync:
+    """Per network responder to the set time requests of Tuya MCUs.
+
+    Every MCU asks for the time after a coordinator restart or a DST change.
+    Responses are queued and sent at most `rate` per second, a device already
+    waiting for a response isn't queued twice. Payloads are built once per
+    second for each pair of epochs and shared by all responses of that second.
+    """
+
+    _services: weakref.WeakKeyDictionary[Any, TuyaTimeSync] = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(self, rate: float = 10.0) -> None:
+        """Init time sync."""
+        self.rate = rate
+        self.sent = 0
+        self.deduplicated = 0
+        self.max_depth = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._queue: dict[TuyaManufCluster, float] = {}
+        self._payloads: dict[
+            tuple[datetime.datetime, datetime.datetime], tuple[int, TuyaTimePayload]
+        ] = {}
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def for_cluster(cls, cluster: TuyaManufCluster) -> TuyaTimeSync:
+        """Return the time sync of the cluster's network, creating it if needed.
+
+        The time sync is shared by all devices of a network and is configured by
+        the `tuya_time_sync_rate` of the first cluster using it.
+        """
+        application = cluster.endpoint.device.application
+        service = cls._services.get(application)
+        if service is None:
+            service = cls(cluster.tuya_time_sync_rate)
+            cls._services[application] = service
+        return service
+
+    @property
+    def depth(self) -> int:
+        """Number of devices waiting for a time response."""
+        return len(self._queue)
+
+    def payload(
+        self,
+        utc_epoch: datetime.datetime,
+        local_epoch: datetime.datetime,
+        now: float | None = None,
+    ) -> TuyaTimePayload:
+        """Return the UTC and local timestamps payload of the current second."""
+        second = int(time.time() if now is None else now)
+        cached = self._payloads.get((utc_epoch, local_epoch))
+        if cached is not None and cached[0] == second:
+            return cached[1]
+
+        utc_timestamp = second - int(utc_epoch.timestamp())
+        local_timestamp = (
+            second
+            + time.localtime(second).tm_gmtoff
+            - int(local_epoch.replace(tzinfo=datetime.UTC).timestamp())
+        )
+        payload = TuyaTimePayload(
+            utc_timestamp.to_bytes(4, "big", signed=False)
+            + local_timestamp.to_bytes(4, "big", signed=False)
+        )
+        self._payloads[(utc_epoch, local_epoch)] = (second, payload)
+        return payload
+
+    def request(self, cluster: TuyaManufCluster) -> None:
+        """Queue a time response to the MCU of a cluster."""
+        if cluster in self._queue:
+            self.deduplicated += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        self._queue[cluster] = loop.time()
+        self.max_depth = max(self.max_depth, len(self._queue))
+        if self._task is None:
+            self._task = loop.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        """Send the queued time responses, `rate` per second."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._queue:
+                cluster = next(iter(self._queue))
+                requested = self._queue.pop(cluster)
+                payload = self.payload(
+                    cluster.set_time_offset, cluster.set_time_local_offset
+                )
+                try:
+                    await cluster.send_time(payload)
+                except Exception as exc:  # noqa: BLE001
+                    cluster.debug("Failed to send time: %r", exc)
+                else:
+                    self.sent += 1
+
+                self.last_latency = loop.time() - requested
+                self.max_latency = max(self.max_latency, self.last_latency)
+                if self._queue:
+                    await asyncio.sleep(1 / self.rate)
+        finally:
+            self._task = None
+
+        _LOGGER.debug(
+            "Sent %d time responses, max queue depth %d, max latency %.3fs",
+            self.sent,
+            self.max_depth,
+            self.max_latency,
+        )
+
+
+class TuyaFrameTrace:
+    """Ring buffer of the last raw frames received from the Tuya MCU of a device.
+
+    Tracing is off until it's enabled for a device, recording a frame is then a
+    single append. Frames are only formatted when dumped, as the
+    ``[endpoint_id, cluster_id, "<hex ZCL frame>"]`` lists replayed by
+    ``scripts/benchmark/tuya_replay.py --recorded``.
+    """
+
+    def __init__(self, size: int = 64) -> None:
+        """Init trace."""
+        self.frames: collections.deque[tuple[float, int, int, bytes]] = (
+            collections.deque(maxlen=size)
+        )
+
+    @classmethod
+    def enable(cls, device: BaseCustomDevice, size: int = 64) -> TuyaFrameTrace:
+        """Start tracing the frames of a device, keeping the last `size` ones."""
+        trace = cls(size)
+        device.tuya_frame_trace = trace
+        return trace
+
+    @staticmethod
+    def disable(device: BaseCustomDevice) -> None:
+        """Stop tracing the frames of a device."""
+        device.tuya_frame_trace = None
+
+    @staticmethod
+    def record(cluster: CustomCluster, data: bytes) -> None:
+        """Record a frame received by a cluster, if its device is traced."""
+        trace = getattr(cluster.endpoint.device, "tuya_frame_trace", None)
+        if trace is not None:
+            trace.frames.append(
+                (time.time(), cluster.endpoint.endpoint_id, cluster.cluster_id, data)
+            )
+
+    def dump(self) -> list[list[int | str]]:
+        """Return the traced frames, oldest first."""
+        return [
+            [endpoint_id, cluster_id, bytes(data).hex()]
+            for _, endpoint_id, cluster_id, data in self.frames
+        ]
+
+
+class LatencyHistogram:
+    """HDR style histogram of durations in nanoseconds.
+
+    Each power of two range is split in `2**SUB_BUCKET_BITS` linear buckets, so
+    percentiles are within about 6% of the recorded values whatever their
+    magnitude, with a few dozen buckets per histogram.
+    """
+
+    SUB_BUCKET_BITS: Final = 4
+
+    def __init__(self) -> None:
+        """Init histogram."""
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._buckets: collections.Counter[int] = collections.Counter()
+
+    def record(self, value: int) -> None:
+        """Record a duration."""
+        shift = value.bit_length() - self.SUB_BUCKET_BITS - 1
+        if shift <= 0:
+            index = value
+        else:
+            index = (shift << self.SUB_BUCKET_BITS) + (value >> shift)
+        self._buckets[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def _highest(self, index: int) -> int:
+        """Return the highest value counted in a bucket."""
+        if index < 2 << self.SUB_BUCKET_BITS:
+            return index
+        shift = (index >> self.SUB_BUCKET_BITS) - 1
+        mantissa = index - (shift << self.SUB_BUCKET_BITS)
+        return ((mantissa + 1) << shift) - 1
+
+    def percentile(self, percent: float) -> int:
+        """Return the duration `percent` % of the recorded ones are at most."""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(self._highest(index), self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the summary of the histogram."""
+        return {
+            "count": self.count,
+            "mean": self.total // self.count if self.count else 0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+@dataclasses.dataclass
+class TuyaDatapointProfile:
+    """Traffic profile of a datapoint."""
+
+    frames: int = 0
+    unknown: int = 0
+    handler: LatencyHistogram = dataclasses.field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile as JSON serializable dict."""
+        return {
+            "frames": self.frames,
+            "unknown": self.unknown,
+            "handler_ns": self.handler.as_dict(),
+        }
+
+
+class TuyaProfiler:
+    """Opt-in traffic profile of the Tuya MCU clusters of a device.
+
+    Counts the frames received and how long they took to decode, and for
+    each datapoint the reports, the reports without a handler and how long
+    the handlers took. Devices without a profiler pay one attribute lookup
+    per frame.
+    """
+
+    def __init__(self) -> None:
+        """Init profiler."""
+        self.frames = 0
+        self.decode = LatencyHistogram()
+        self.datapoints: dict[int, TuyaDatapointProfile] = {}
+
+    @classmethod
+    def enable(cls, device: BaseCustomDevice) -> TuyaProfiler:
+        """Start profiling the Tuya MCU traffic of a device."""
+        profiler = cls()
+        device.tuya_profiler = profiler
+        return profiler
+
+    @staticmethod
+    def disable(device: BaseCustomDevice) -> None:
+        """Stop profiling the Tuya MCU traffic of a device."""
+        device.tuya_profiler = None
+
+    @staticmethod
+    def get(cluster: CustomCluster) -> TuyaProfiler | None:
+        """Return the profiler of a cluster's device, None if not profiled."""
+        return getattr(cluster.endpoint.device, "tuya_profiler", None)
+
+    def decoded(self, elapsed: int) -> None:
+        """Record a frame decoded in `elapsed` nanoseconds."""
+        self.frames += 1
+        self.decode.record(elapsed)
+
+    def handled(self, dp: int, elapsed: int, known: bool = True) -> None:
+        """Record a datapoint report handled in `elapsed` nanoseconds."""
+        profile = self.datapoints.get(dp)
+        if profile is None:
+            profile = self.datapoints[dp] = TuyaDatapointProfile()
+        profile.frames += 1
+        if known:
+            profile.handler.record(elapsed)
+        else:
+            profile.unknown += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile as JSON serializable dict."""
+        return {
+            "frames": self.frames,
+            "decode_ns": self.decode.as_dict(),
+            "datapoints": {
+                str(dp): profile.as_dict()
+                for dp, profile in sorted(self.datapoints.items())
+            },
+        }
+
+    @staticmethod
+    def export(devices: Iterable[BaseCustomDevice]) -> str:
+        """Return the profiles of the profiled devices as JSON, by IEEE."""
+        return json.dumps(
+            {
+                str(device.ieee): profiler.as_dict()
+                for device in devices
+                if (profiler := getattr(device, "tuya_profiler", None)) is not None
+            }
+        )
+
+
+class TuyaDefaultResponse(enum.Enum):
+    """When Tuya clusters answer incoming frames with a ZCL default response."""
+
+    # every frame which doesn't disable the default response
+    ALWAYS = "always"
+    # only frames which couldn't be handled
+    ON_ERROR = "on_error"
+    # errors, and at most one success per cluster every `window` seconds
+    COALESCED = "coalesced"
+    NEVER = "never"
+
+
+# device families retransmitting frames which aren't answered
+TUYA_DEFAULT_RESPONSE_MODELS: Final[dict[str, TuyaDefaultResponse]] = {
+    "TS0041": TuyaDefaultResponse.ALWAYS,
+    "TS0042": TuyaDefaultResponse.ALWAYS,
+    "TS0043": TuyaDefaultResponse.ALWAYS,
+    "TS0044": TuyaDefaultResponse.ALWAYS,
+    "TS004F": TuyaDefaultResponse.ALWAYS,
+    "TS1201": TuyaDefaultResponse.ALWAYS,
+}
+
+
+class TuyaDefaultResponsePolicy:
+    """Default responses sent by Tuya clusters to the frames they handle.
+
+    Answering every report of frequently reporting MCU devices doubles the
+    unicast traffic of the coordinator. The policy of a cluster is, in order
+    of precedence, the `tuya_default_response` of its device, the one of the
+    cluster set by its quirk, the one of the device model in
+    `TUYA_DEFAULT_RESPONSE_MODELS`, then `default`. `saved` counts the
+    responses each policy didn't send.
+    """
+
+    default: TuyaDefaultResponse = TuyaDefaultResponse.ALWAYS
+    window: float = 1.0
+    saved: collections.Counter[TuyaDefaultResponse] = collections.Counter()
+
+    _last_sent: weakref.WeakKeyDictionary[Cluster, float] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def policy(cls, cluster: Cluster) -> TuyaDefaultResponse:
+        """Return the default response policy of a cluster."""
+        device = cluster.endpoint.device
+        policy = getattr(device, "tuya_default_response", None) or getattr(
+            cluster, "tuya_default_response", None
+        )
+        if policy is None:
+            policy = TUYA_DEFAULT_RESPONSE_MODELS.get(device.model, cls.default)
+        return policy
+
+    @classmethod
+    def respond(
+        cls,
+        cluster: Cluster,
+        hdr: foundation.ZCLHeader,
+        status: foundation.Status = foundation.Status.SUCCESS,
+    ) -> None:
+        """Send the default response to a frame, if the policy of the cluster does."""
+        if hdr.frame_control.disable_default_response:
+            return
+
+        policy = cls.policy(cluster)
+        if policy is TuyaDefaultResponse.ALWAYS or (
+            status != foundation.Status.SUCCESS
+            and policy is not TuyaDefaultResponse.NEVER
+        ):
+            cluster.send_default_rsp(hdr, status=status)
+            return
+
+        if policy is TuyaDefaultResponse.COALESCED:
+            now = time.monotonic()
+            last_sent = cls._last_sent.get(cluster)
+            if last_sent is None or now - last_sent >= cls.window:
+                cls._last_sent[cluster] = now
+                cluster.send_default_rsp(hdr, status=status)
+                return
+
+        cls.saved[policy] += 1
+
+    @classmethod
+    def acknowledge(cls, cluster: Cluster, hdr: foundation.ZCLHeader) -> bool:
+        """Answer a frame with SUCCESS before handling it, if the policy always does.
+
+        Returns whether the frame is answered, otherwise `respond` is to be
+        called with the status of the handling.
+        """
+        if cls.policy(cluster) is not TuyaDefaultResponse.ALWAYS:
+            return False
+        if not hdr.frame_control.disable_default_response:
+            cluster.send_default_rsp(hdr, status=foundation.Status.SUCCESS)
+        return True
+
+
+_SNAPSHOT_RECORD: Final = struct.Struct("<8sBBHHdH")
+
+
+class TuyaAttributeSnapshot:
+    """Append-only file of the attribute caches of Tuya clusters.
+
+    Tuya MCUs only report changed datapoints, so after a restart the local
+    clusters stay empty until the next report. Every attribute update of the
+    local and Tuya manufacturer clusters of attached devices is appended to
+    the file, and restored through `update_attribute` on the next start. How
+    old a restored value is can be read from `last_updated`.
+
+    Snapshots are opt-in: once `enable` is called, the manufacturer cluster of
+    each Tuya device attaches it when the device is created. Clusters that
+    override `_update_attribute` are left out, as their override would take
+    restored values for new device reports.
+
+    A record is the device IEEE, endpoint id, cluster type, cluster id,
+    attribute id and UNIX timestamp, followed by the length prefixed value
+    serialized with its attribute type. Records are written every
+    `flush_interval` seconds. The file is rewritten once it holds
+    `compact_ratio` times more records than attributes.
+    """
+
+    # snapshot attached to new devices, see enable()
+    active: TuyaAttributeSnapshot | None = None
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        flush_interval: float = 5.0,
+        compact_ratio: int = 4,
+    ) -> None:
+        """Init snapshot, without reading the file."""
+        self.path = pathlib.Path(path)
+        self.flush_interval = flush_interval
+        self.compact_ratio = compact_ratio
+        self.restored = 0
+        self.writes = 0
+        self._records: dict[
+            t.EUI64, dict[tuple[int, int, int, int], tuple[float, bytes]]
+        ] = {}
+        self._live = 0
+        self._appended = 0
+        self._buffer = bytearray()
+        self._file: io.BufferedWriter | None = None
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._devices: dict[t.EUI64, BaseCustomDevice] = {}
+        self._unsubscribes: dict[t.EUI64, list[Callable[[], None]]] = {}
+
+    @classmethod
+    def open(cls, path: str | os.PathLike, **kwargs: Any) -> TuyaAttributeSnapshot:
+        """Open a snapshot file, loading the records it holds."""
+        snapshot = cls(path, **kwargs)
+        snapshot.load()
+        return snapshot
+
+    @classmethod
+    def enable(cls, path: str | os.PathLike, **kwargs: Any) -> TuyaAttributeSnapshot:
+        """Snapshot the Tuya devices created from now on in the file at `path`."""
+        cls.disable()
+        cls.active = cls.open(path, **kwargs)
+        return cls.active
+
+    @classmethod
+    def disable(cls) -> None:
+        """Close the enabled snapshot, if any."""
+        if cls.active is not None:
+            cls.active.close()
+            cls.active = None
+
+    @classmethod
+    def attach_later(cls, device: BaseCustomDevice) -> None:
+        """Attach a device being created to the enabled snapshot, if any.
+
+        Called from the init of the Tuya manufacturer clusters, while the other
+        clusters of the device might not exist yet, so the device is attached
+        on the next iteration of the event loop.
+        """
+        snapshot = cls.active
+        if snapshot is None or snapshot._devices.get(device.ieee) is device:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.call_soon(snapshot.attach, device)
+
+    def load(self) -> None:
+        """Read the records of the file, the last record of an attribute wins."""
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            data = b""
+
+        offset = 0
+        size = _SNAPSHOT_RECORD.size
+        while offset + size <= len(data):
+            ieee, endpoint_id, cluster_type, cluster_id, attrid, timestamp, length = (
+                _SNAPSHOT_RECORD.unpack_from(data, offset)
+            )
+            if offset + size + length > len(data):
+                break
+            offset += size
+            self._store(
+                t.EUI64.deserialize(ieee)[0],
+                (endpoint_id, cluster_type, cluster_id, attrid),
+                timestamp,
+                data[offset : offset + length],
+            )
+            offset += length
+            self._appended += 1
+
+        if offset < len(data):
+            # drop the record of a write interrupted by a crash
+            _LOGGER.debug("Truncated Tuya attribute snapshot %s", self.path)
+            self.compact()
+        else:
+            self._file = open(self.path, "ab")  # noqa: SIM115
+
+    def _store(
+        self,
+        ieee: t.EUI64,
+        key: tuple[int, int, int, int],
+        timestamp: float,
+        payload: bytes,
+    ) -> None:
+        records = self._records.setdefault(ieee, {})
+        if key not in records:
+            self._live += 1
+        records[key] = (timestamp, payload)
+
+    def restore(self, device: BaseCustomDevice) -> int:
+        """Restore the cached attributes of a device, return how many were."""
+        restored = 0
+        for key, (_timestamp, payload) in self._records.get(device.ieee, {}).items():
+            endpoint_id, cluster_type, cluster_id, attrid = key
+            endpoint = device.endpoints.get(endpoint_id)
+            if endpoint is None or endpoint_id == 0:
+                continue
+            if cluster_type == ClusterType.Server:
+                cluster = endpoint.in_clusters.get(cluster_id)
+            else:
+                cluster = endpoint.out_clusters.get(cluster_id)
+            if cluster is None or not self._snapshots(cluster):
+                continue
+
+            try:
+                attr_def = cluster.find_attribute(attrid)
+                value, _ = attr_def.type.deserialize(payload)
+            except (KeyError, ValueError):
+                continue
+            # a report received before the restore is more recent
+            if cluster.get(attr_def.id) is not None:
+                continue
+
+            cluster.update_attribute(attr_def.name, value)
+            restored += 1
+
+        self.restored += restored
+        return restored
+
+    def last_updated(
+        self, cluster: Cluster, attribute: int | str
+    ) -> datetime.datetime | None:
+        """Return when an attribute of a cluster was last updated, if recorded."""
+        try:
+            attrid = cluster.find_attribute(attribute).id
+        except KeyError:
+            return None
+        key = (
+            cluster.endpoint.endpoint_id,
+            cluster.cluster_type,
+            cluster.cluster_id,
+            attrid,
+        )
+        record = self._records.get(cluster.endpoint.device.ieee, {}).get(key)
+        if record is None:
+            return None
+        return datetime.datetime.fromtimestamp(record[0], datetime.UTC)
+
+    @staticmethod
+    def _snapshots(cluster: Cluster) -> bool:
+        """Return True if the attribute cache of a cluster is snapshotted."""
+        return (
+            isinstance(
+                cluster, (LocalDataCluster, TuyaManufCluster, TuyaNewManufCluster)
+            )
+            and type(cluster)._update_attribute is Cluster._update_attribute
+        )
+
+    def attach(self, device: BaseCustomDevice) -> int:
+        """Restore the attributes of a device, then record their updates."""
+        if device.ieee in self._unsubscribes:
+            if self._devices.get(device.ieee) is device:
+                return 0
+            # the device was created again, e.g. when it rejoined
+            self.detach(device)
+        self._devices[device.ieee] = device
+        restored = self.restore(device)
+
+        unsubscribes = self._unsubscribes[device.ieee] = []
+        for endpoint_id, endpoint in device.endpoints.items():
+            if endpoint_id == 0:
+                continue
+            for cluster in (
+                *endpoint.in_clusters.values(),
+                *endpoint.out_clusters.values(),
+            ):
+                if self._snapshots(cluster):
+                    unsubscribes.append(
+                        cluster.on_event(
+                            AttributeUpdatedEvent.event_type,
+                            functools.partial(self._attribute_updated, cluster),
+                        )
+                    )
+        return restored
+
+    def attach_all(self, devices: Iterable[BaseCustomDevice]) -> int:
+        """Attach devices in bulk, return how many attributes were restored."""
+        return sum(self.attach(device) for device in devices)
+
+    def detach(self, device: BaseCustomDevice) -> None:
+        """Stop recording the attribute updates of a device."""
+        self._devices.pop(device.ieee, None)
+        for unsubscribe in self._unsubscribes.pop(device.ieee, ()):
+            unsubscribe()
+
+    def _attribute_updated(
+        self, cluster: Cluster, event: AttributeUpdatedEvent
+    ) -> None:
+        """Append an attribute update to the file."""
+        try:
+            attr_def = cluster.find_attribute(event.attribute_id)
+            value = event.value
+            if not isinstance(value, attr_def.type):
+                # don't store values which can't be restored as they were
+                converted = attr_def.type(value)
+                if converted != value:
+                    return
+                value = converted
+            payload = value.serialize()
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return
+
+        ieee = cluster.endpoint.device.ieee
+        key = (event.endpoint_id, event.cluster_type, event.cluster_id, attr_def.id)
+        timestamp = time.time()
+        self._store(ieee, key, timestamp, payload)
+        self._buffer += _SNAPSHOT_RECORD.pack(
+            ieee.serialize(), *key, timestamp, len(payload)
+        )
+        self._buffer += payload
+        self._appended += 1
+
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.flush_interval, self.flush
+            )
+
+    def flush(self) -> None:
+        """Write the pending records, compacting the file if needed."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._appended > self.compact_ratio * self._live:
+            self.compact()
+            return
+        if not self._buffer or self._file is None:
+            return
+
+        self._file.write(self._buffer)
+        self._file.flush()
+        self.writes += 1
+        self._buffer.clear()
+
+    def compact(self) -> None:
+        """Rewrite the file with the last record of each attribute."""
+        if self._file is not None:
+            self._file.close()
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as file:
+            for ieee, records in self._records.items():
+                for key, (timestamp, payload) in records.items():
+                    file.write(
+                        _SNAPSHOT_RECORD.pack(
+                            ieee.serialize(), *key, timestamp, len(payload)
+                        )
+                    )
+                    file.write(payload)
+        os.replace(tmp_path, self.path)
+
+        self._file = open(self.path, "ab")  # noqa: SIM115
+        self._appended = self._live
+        self._buffer.clear()
+        self.writes += 1
+
+    def close(self) -> None:
+        """Write the pending records, then stop recording updates."""
+        for ieee in list(self._unsubscribes):
+            for unsubscribe in self._unsubscribes.pop(ieee):
+                unsubscribe()
+        self._devices.clear()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TimerWheelHandle:
+    """Timer of a `TimerWheel`, cancellable like an asyncio timer handle."""
+
+    def __init__(
+        self, wheel: TimerWheel, due: int, callback: Callable[..., Any], args: tuple
+    ) -> None:
+        """Init handle."""
+        self._wheel = wheel
+        self._due = due
+        self._callback = callback
+        self._args = args
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """Cancel the timer, does nothing if it already ran."""
+        if not self._cancelled:
+            self._cancelled = True
+            self._wheel._remove(self)
+
+    def cancelled(self) -> bool:
+        """Return True if the timer was cancelled."""
+        return self._cancelled
+
+    def when(self) -> float:
+        """Return the loop time at which the timer runs."""
+        return self._wheel._start + self._due * self._wheel.tick
+
+
+class TimerWheel:
+    """Coarse timer wheel shared by clusters resetting a state after a delay.
+
+    Timers are kept in `slots` buckets of `tick` seconds and run on the first
+    tick at or after their deadline, so up to `tick` seconds late. Arming and
+    cancelling a timer is O(1) and, while timers are pending, the event loop
+    runs a single callback per tick however many timers there are.
+    """
+
+    _wheels: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel] = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, tick: float = 1.0, slots: int = 256
+    ) -> None:
+        """Init wheel."""
+        self.tick = tick
+        self._loop = loop
+        self._slots: list[dict[TimerWheelHandle, None]] = [{} for _ in range(slots)]
+        self._count = 0
+        self._start = 0.0
+        self._ticks = 0
+        self._tick_handle: asyncio.TimerHandle | None = None
+
+    @classmethod
+    def get(cls) -> TimerWheel:
+        """Return the timer wheel of the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        wheel = cls._wheels.get(loop)
+        if wheel is None:
+            wheel = cls._wheels[loop] = cls(loop)
+        return wheel
+
+    def __len__(self) -> int:
+        """Return the number of pending timers."""
+        return self._count
+
+    def call_later(
+        self, delay: float, callback: Callable[..., Any], *args: Any
+    ) -> TimerWheelHandle:
+        """Run `callback(*args)` once `delay` seconds elapsed."""
+        now = self._loop.time()
+        if self._tick_handle is None:
+            self._start = now
+            self._ticks = 0
+            self._tick_handle = self._loop.call_at(now + self.tick, self._on_tick)
+
+        due = max(self._ticks + 1, math.ceil((now + delay - self._start) / self.tick))
+        handle = TimerWheelHandle(self, due, callback, args)
+        self._slots[due % len(self._slots)][handle] = None
+        self._count += 1
+        return handle
+
+    def _remove(self, handle: TimerWheelHandle) -> None:
+        slot = self._slots[handle._due % len(self._slots)]
+        if handle in slot:
+            del slot[handle]
+            self._count -= 1
+
+    def _on_tick(self) -> None:
+        """Run the timers due on this tick and schedule the next one."""
+        self._ticks += 1
+        slot = self._slots[self._ticks % len(self._slots)]
+        due = [handle for handle in slot if handle._due == self._ticks]
+        for handle in due:
+            del slot[handle]
+            self._count -= 1
+            try:
+                handle._callback(*handle._args)
+            except Exception:  # noqa: BLE001
+                _LOGGER.exception("Error running timer callback %s", handle._callback)
+
+        if self._count:
+            self._tick_handle = self._loop.call_at(
+                self._start + (self._ticks + 1) * self.tick, self._on_tick
+            )
+        else:
+            self._tick_handle = None
+
+
+class TimerWheelResetMixin:
+    """Schedule the ``reset_s`` reset of motion clusters on the shared `TimerWheel`.
+
+    ``MotionWithReset``, ``MotionOnEvent`` and ``OccupancyWithReset`` arm their
+    reset with ``self._loop.call_later``, which the timer wheel provides.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._loop = TimerWheel.get()
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class AttributesUpdatedEvent:
+    """Event generated once for the attributes updated together by a frame."""
+
+    event_type: Final[str] = "attributes_updated"
+
+    device_ieee: str
+    endpoint_id: int
+    cluster_type: ClusterType
+    cluster_id: int
+    values: dict[int, Any]
+
+
+class BulkAttributeUpdateMixin:
+    """Update the attributes decoded from one device frame together."""
+
+    def update_attributes(self, values: dict[int | str, Any]) -> None:
+        """Update attributes by id or name, from a single device frame.
+
+        Every value goes through `_update_attribute` once, so the cache is
+        written and the per attribute events, from which zigpy persists the
+        cache and entities update, are fired as before. A single
+        `AttributesUpdatedEvent` with all values follows, for consumers
+        handling the frame as a whole.
+        """
+        updates: dict[int, Any] = {}
+        for attr, value in values.items():
+            try:
+                updates[self.find_attribute(attr).id] = value
+            except KeyError:
+                if isinstance(attr, str):
+                    self.debug("no such attribute: %s", attr)
+                else:
+                    updates[attr] = value
+
+        if not updates:
+            return
+
+        for attrid, value in updates.items():
+            self._update_attribute(attrid, value)
+
+        self.emit(
+            AttributesUpdatedEvent.event_type,
+            AttributesUpdatedEvent(
+                device_ieee=str(self.endpoint.device.ieee),
+                endpoint_id=self.endpoint.endpoint_id,
+                cluster_type=self._type,
+                cluster_id=self.cluster_id,
+                values=updates,
+            ),
+        )
+
+
+class TuyaBus(Bus):
+    """Event bus dispatching to handlers bound once instead of on every event.
+
+    Listeners added with `add_listener` receive every `listener_event` as with
+    `Bus`, but their handlers are looked up by name once per event name until
+    the listeners change. A handler added with `add_channel_listener` receives
+    only the events whose first argument is its channel, found with a single
+    dictionary lookup however many channels the device has.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Init event bus."""
+        super().__init__(*args, **kwargs)
+        self._handlers: dict[str, tuple[Callable, ...]] = {}
+        self._channels: dict[str, dict[Any, Callable]] = {}
+
+    def _add_listener(self, listener: Any, include_context: bool) -> int:
+        self._handlers.clear()
+        return super()._add_listener(listener, include_context)
+
+    def remove_listener(self, listener: Any) -> None:
+        """Remove a listener."""
+        self._handlers.clear()
+        super().remove_listener(listener)
+
+    def add_channel_listener(self, event: str, channel: Any, handler: Callable) -> None:
+        """Route `event` for `channel` to `handler`, replacing any previous one."""
+        self._channels.setdefault(event, {})[channel] = handler
+
+    def remove_channel_listener(self, event: str, channel: Any) -> None:
+        """Stop routing `event` for `channel`."""
+        self._channels.get(event, {}).pop(channel, None)
+
+    def _bind(self, method_name: str) -> tuple[Callable, ...]:
+        handlers = []
+        for listener, include_context in self._listeners.values():
+            method = getattr(listener, method_name, None)
+            if method is None:
+                continue
+            if include_context:
+                method = functools.partial(method, self)
+            handlers.append(method)
+        handlers = self._handlers[method_name] = tuple(handlers)
+        return handlers
+
+    def listener_event(self, method_name: str, *args) -> list[Any | None]:
+        """Call the handler of the channel in `args[0]` and of every listener."""
+        handlers = self._handlers.get(method_name)
+        if handlers is None:
+            handlers = self._bind(method_name)
+        channels = self._channels.get(method_name)
+        if channels and args:
+            handler = channels.get(args[0])
+            if handler is not None:
+                handlers = (handler, *handlers)
+
+        result = []
+        for handler in handlers:
+            try:
+                result.append(handler(*args))
+            except Exception as exc:  # noqa: BLE001
+                _LOGGER.debug(
+                    "Error calling listener %r with args %r",
+                    handler,
+                    args,
+                    exc_info=exc,
+                )
+        return result
+
+
 class NoManufacturerCluster(CustomCluster):
     """Originally used to force no manufacturer id in command. Now without function.
 
@@ -355,6 +1602,13 @@ class TuyaManufCluster(CustomCluster):
     set_time_offset: datetime.datetime | None = None
     set_time_local_offset: datetime.datetime | None = None
 
+    # coalescing window (seconds) and in-flight frame limit of MCU commands
+    tuya_write_window: float = 0.0
+    tuya_max_in_flight: int = 4
+
+    # time responses sent per second to all devices of a network
+    tuya_time_sync_rate: float = 10.0
+
     # TODO: remove, kept for backwards compatibility
     Command = Command
     MCUVersionRsp = MCUVersionRsp
@@ -414,16 +1668,33 @@ class TuyaManufCluster(CustomCluster):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.command_bus = Bus()
+        self.endpoint.device.command_bus = TuyaBus()
         self.endpoint.device.command_bus.add_listener(self)  # listen MCU commands
+        TuyaAttributeSnapshot.attach_later(self.endpoint.device)
 
     def tuya_mcu_command(self, command: Command):  # type:ignore[valid-type]
         """Tuya MCU command listener. Only endpoint:1 must listen to MCU commands."""
 
-        self.create_catching_task(
-            self.command(TUYA_SET_DATA, command, expect_reply=True)
+        TuyaWriteQueue.for_cluster(self).write(
+            self,
+            ("command", command.command_id),
+            lambda: self.command(TUYA_SET_DATA, command, expect_reply=True),
         )
 
+    def deserialize(
+        self, data: bytes
+    ) -> tuple[foundation.ZCLHeader, foundation.CommandSchema | bytes]:
+        """Deserialize a frame, recording it if the device is traced."""
+        TuyaFrameTrace.record(self, data)
+        profiler = TuyaProfiler.get(self)
+        if profiler is None:
+            return super().deserialize(data)
+
+        start = time.perf_counter_ns()
+        result = super().deserialize(data)
+        profiler.decoded(time.perf_counter_ns() - start)
+        return result
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -439,8 +1710,7 @@ class TuyaManufCluster(CustomCluster):
             )
 
         # Send default response because the MCU expects it
-        if not hdr.frame_control.disable_default_response:
-            self.send_default_rsp(hdr, status=foundation.Status.SUCCESS)
+        TuyaDefaultResponsePolicy.respond(self, hdr)
 
         _LOGGER.debug(
             "[0x%04x:%s:0x%04x] Got set time request (command 0x%04x)",
@@ -452,19 +1722,11 @@ class TuyaManufCluster(CustomCluster):
 
         assert self.set_time_local_offset is not None
 
-        payload = TuyaTimePayload()
-        utc_timestamp = int(
-            (datetime.datetime.now(datetime.UTC) - self.set_time_offset).total_seconds()
-        )
-        local_timestamp = int(
-            (datetime.datetime.now() - self.set_time_local_offset).total_seconds()
-        )
-        payload.extend(utc_timestamp.to_bytes(4, "big", signed=False))
-        payload.extend(local_timestamp.to_bytes(4, "big", signed=False))
+        TuyaTimeSync.for_cluster(self).request(self)
 
-        self.create_catching_task(
-            super().command(TUYA_SET_TIME, payload, expect_reply=False)
-        )
+    async def send_time(self, payload: TuyaTimePayload) -> Any:
+        """Send the set time command answering a time request."""
+        return await super().command(TUYA_SET_TIME, payload, expect_reply=False)
 
     def _write_attr_records(self, attributes: dict) -> list[foundation.Attribute]:
         """Convert attributes dict to list of Attribute records."""
@@ -482,6 +1744,14 @@ class TuyaManufCluster(CustomCluster):
 class TuyaManufClusterAttributes(TuyaManufCluster):
     """Manufacturer specific cluster for Tuya converting attributes <-> commands."""
 
+    # Opt-in per quirk: write several attributes with as few multi datapoint
+    # set_data frames as fit in `tuya_max_payload_size`. Only for MCUs known to
+    # apply every datapoint of such frames: one ignoring the extra datapoints
+    # still acknowledges the frame, only delivery failures fall back to one
+    # frame per datapoint.
+    tuya_multi_dp_writes: bool = False
+    tuya_max_payload_size: int = TUYA_MAX_APS_PAYLOAD
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -496,29 +1766,51 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
             )
 
         # Send default response because the MCU expects it
-        if not hdr.frame_control.disable_default_response:
-            self.send_default_rsp(hdr, status=foundation.Status.SUCCESS)
+        answered = TuyaDefaultResponsePolicy.acknowledge(self, hdr)
 
         tuya_cmd = args[0].command_id
         tuya_data = args[0].data
 
-        _LOGGER.debug(
-            "[0x%04x:%s:0x%04x] Received value %s "
-            "for attribute 0x%04x (command 0x%04x)",
-            self.endpoint.device.nwk,
-            self.endpoint.endpoint_id,
-            self.cluster_id,
-            repr(tuya_data[1:]),
-            tuya_cmd,
-            hdr.command_id,
-        )
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "[0x%04x:%s:0x%04x] Received value %r "
+                "for attribute 0x%04x (command 0x%04x)",
+                self.endpoint.device.nwk,
+                self.endpoint.endpoint_id,
+                self.cluster_id,
+                tuya_data[1:],
+                tuya_cmd,
+                hdr.command_id,
+            )
 
+        profiler = TuyaProfiler.get(self)
         if tuya_cmd not in self.attributes:
+            if profiler is not None:
+                profiler.handled(tuya_cmd & 0xFF, 0, known=False)
+            if not answered:
+                TuyaDefaultResponsePolicy.respond(
+                    self, hdr, foundation.Status.UNSUPPORTED_ATTRIBUTE
+                )
             return
 
+        start = time.perf_counter_ns() if profiler is not None else 0
         ztype = self.attributes[tuya_cmd].type
-        zvalue = ztype(tuya_data)
+        try:
+            zvalue = ztype(tuya_data)
+        except (TypeError, ValueError) as exc:
+            self.debug(
+                "Invalid value %r of attribute 0x%04x: %s", tuya_data, tuya_cmd, exc
+            )
+            if not answered:
+                TuyaDefaultResponsePolicy.respond(
+                    self, hdr, foundation.Status.INVALID_VALUE
+                )
+            return
         self._update_attribute(tuya_cmd, zvalue)
+        if profiler is not None:
+            profiler.handled(tuya_cmd & 0xFF, time.perf_counter_ns() - start)
+        if not answered:
+            TuyaDefaultResponsePolicy.respond(self, hdr)
 
     async def read_attributes(
         self,
@@ -541,6 +1833,9 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
 
         records = self._write_attr_records(attributes)
 
+        if len(records) > 1 and self.tuya_multi_dp_writes:
+            return await self._write_multi_dp_records(records, manufacturer)
+
         for record in records:
             cmd_payload = TuyaManufCluster.Command()
             cmd_payload.status = 0
@@ -559,6 +1854,293 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
 
         return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
 
+    @staticmethod
+    def _record_to_datapoint(record: foundation.Attribute) -> TuyaDatapointData:
+        """Convert a legacy attribute record to the equivalent datapoint.
+
+        The attribute id holds the datapoint type in its high byte and the
+        datapoint id in its low byte, `Data` the length prefixed value.
+        """
+        data = Data(record.value.value)
+        tuya_data = TuyaData(raw=t.LVBytes(data[1:]))
+        tuya_data.dp_type = TuyaDPType(record.attrid >> 8)
+        return TuyaDatapointData(dp=record.attrid & 0xFF, data=tuya_data)
+
+    async def _send_datapoints(
+        self,
+        datapoints: list[TuyaDatapointData],
+        manufacturer: int | None,
+    ) -> None:
+        """Send datapoints within a single set_data frame."""
+        tsn = self.endpoint.device.application.get_sequence()
+        await self.request(
+            False,
+            TUYA_SET_DATA,
+            TuyaCommand,
+            0,
+            tsn,
+            datapoints,
+            manufacturer=manufacturer,
+            expect_reply=False,
+            tsn=tsn,
+        )
+
+    async def _write_multi_dp_records(
+        self,
+        records: list[foundation.Attribute],
+        manufacturer: int | UndefinedType | None,
+    ) -> list[list[foundation.WriteAttributesStatusRecord]]:
+        """Write attribute records packed in as few set_data frames as possible."""
+        if manufacturer is UNDEFINED:
+            # set_data is defined without manufacturer code
+            manufacturer = None
+
+        # room left after the ZCL header and the Tuya command status and tsn
+        header_size = 5 if manufacturer is not None else 3
+        budget = self.tuya_max_payload_size - header_size - 2
+
+        attrids = {}
+        datapoints = []
+        for record in records:
+            datapoint = self._record_to_datapoint(record)
+            attrids[datapoint.dp] = record.attrid
+            datapoints.append(datapoint)
+
+        failed = []
+        for batch in pack_datapoints(datapoints, budget):
+            try:
+                await self._send_datapoints(batch, manufacturer)
+            except zigpy.exceptions.ZigbeeException as exc:
+                self.debug(
+                    "Failed to write datapoints %s: %s",
+                    [attrids[datapoint.dp] for datapoint in batch],
+                    exc,
+                )
+                if len(batch) == 1:
+                    failed.append(attrids[batch[0].dp])
+                    continue
+
+                # fall back to one frame per datapoint, to report per attribute status
+                for datapoint in batch:
+                    attrid = attrids[datapoint.dp]
+                    try:
+                        await self._send_datapoints([datapoint], manufacturer)
+                    except zigpy.exceptions.ZigbeeException as exc:
+                        self.debug("Failed to write datapoint %s: %s", attrid, exc)
+                        failed.append(attrid)
+
+        if not failed:
+            return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
+
+        return [
+            [
+                foundation.WriteAttributesStatusRecord(
+                    foundation.Status.FAILURE, attrid
+                )
+                for attrid in failed
+            ]
+        ]
+
+
+@dataclasses.dataclass
+class TuyaSpellTiming:
+    """Timing of the spells cast on a device, in event loop time."""
+
+    queued: float
+    started: float | None = None
+    finished: float | None = None
+    attempts: int = 0
+    error: Exception | None = None
+
+    @property
+    def wait(self) -> float | None:
+        """Seconds spent waiting for a free slot."""
+        if self.started is None:
+            return None
+        return self.started - self.queued
+
+    @property
+    def duration(self) -> float | None:
+        """Seconds spent casting the spells, retries included."""
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class TuyaSpellScheduler:
+    """Per network scheduler of the spells cast on enchanted devices.
+
+    When a whole network is reconfigured, e.g. after a coordinator change,
+    spells are cast on at most `max_concurrency` devices at a time and on at
+    most `max_per_parent` children of the same parent router. Routers are
+    configured first, then mains powered devices, then sleepy end devices.
+    Failed spells are retried up to `max_attempts` times per device, as long
+    as the network wide `retry_budget` isn't spent.
+    """
+
+    _schedulers: weakref.WeakKeyDictionary[Any, TuyaSpellScheduler] = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_per_parent: int = 2,
+        retry_budget: int = 50,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+    ) -> None:
+        """Init scheduler."""
+        self.max_concurrency = max_concurrency
+        self.max_per_parent = max_per_parent
+        self.retry_budget = retry_budget
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.timings: dict[t.EUI64, TuyaSpellTiming] = {}
+        self._running = 0
+        self._per_parent: collections.Counter[t.EUI64] = collections.Counter()
+        self._waiters: list[tuple[int, int, t.EUI64 | None, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatch_handle: asyncio.Handle | None = None
+
+    @classmethod
+    def for_device(cls, device: BaseCustomDevice) -> TuyaSpellScheduler:
+        """Return the spell scheduler of the device's network."""
+        application = device.application
+        scheduler = cls._schedulers.get(application)
+        if scheduler is None:
+            scheduler = cls._schedulers[application] = cls()
+        return scheduler
+
+    @property
+    def running(self) -> int:
+        """Number of devices spells are being cast on."""
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        """Number of devices waiting for a free slot."""
+        return sum(not future.done() for *_, future in self._waiters)
+
+    @property
+    def done(self) -> int:
+        """Number of devices the spells were cast on successfully."""
+        return sum(
+            timing.finished is not None and timing.error is None
+            for timing in self.timings.values()
+        )
+
+    @property
+    def failed(self) -> int:
+        """Number of devices the spells failed on."""
+        return sum(timing.error is not None for timing in self.timings.values())
+
+    @staticmethod
+    def priority(device: BaseCustomDevice) -> int:
+        """Return the priority of a device, lowest first."""
+        node_desc = device.node_desc
+        if node_desc is None:
+            return 2
+        if node_desc.is_router:
+            return 0
+        if node_desc.is_mains_powered:
+            return 1
+        return 2
+
+    @staticmethod
+    def parent(device: BaseCustomDevice) -> t.EUI64 | None:
+        """Return the parent router of an end device from the network topology."""
+        neighbors = device.application.topology.neighbors
+        for neighbor in neighbors.get(device.ieee, ()):
+            if neighbor.relationship == zdo_t.Neighbor.Relationship.Parent:
+                return neighbor.ieee
+        for router, router_neighbors in neighbors.items():
+            for neighbor in router_neighbors:
+                if (
+                    neighbor.ieee == device.ieee
+                    and neighbor.relationship == zdo_t.Neighbor.Relationship.Child
+                ):
+                    return router
+        return None
+
+    async def cast(
+        self, device: BaseCustomDevice, spells: Callable[[], Awaitable]
+    ) -> None:
+        """Cast the spells on a device once a slot is free, retrying failures."""
+        loop = asyncio.get_running_loop()
+        timing = self.timings[device.ieee] = TuyaSpellTiming(queued=loop.time())
+        parent = self.parent(device)
+        await self._acquire(self.priority(device), parent)
+        timing.started = loop.time()
+
+        try:
+            while True:
+                timing.attempts += 1
+                try:
+                    await spells()
+                    break
+                except (zigpy.exceptions.ZigbeeException, TimeoutError) as exc:
+                    if timing.attempts >= self.max_attempts or self.retry_budget <= 0:
+                        timing.error = exc
+                        raise
+                    self.retry_budget -= 1
+                    device.debug("Spell failed, retrying: %r", exc)
+                    await asyncio.sleep(self.retry_delay * timing.attempts)
+        finally:
+            timing.finished = loop.time()
+            self._release(parent)
+
+        device.debug(
+            "Cast spells in %.2fs, waited %.2fs, %d attempts, %d/%d done",
+            timing.duration,
+            timing.wait,
+            timing.attempts,
+            self.done,
+            len(self.timings),
+        )
+
+    async def _acquire(self, priority: int, parent: t.EUI64 | None) -> None:
+        """Wait for a free slot, globally and under the parent router."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), parent, future))
+        # devices queued during the same loop iteration are granted by priority
+        if self._dispatch_handle is None:
+            self._dispatch_handle = asyncio.get_running_loop().call_soon(self._dispatch)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was granted while the task was being cancelled
+                self._release(parent)
+            raise
+
+    def _release(self, parent: t.EUI64 | None) -> None:
+        """Free a slot and hand it to the next waiting device."""
+        self._running -= 1
+        if parent is not None:
+            self._per_parent[parent] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the waiting devices, in priority order."""
+        self._dispatch_handle = None
+        blocked = []
+        while self._waiters and self._running < self.max_concurrency:
+            waiter = heapq.heappop(self._waiters)
+            _, _, parent, future = waiter
+            if future.done():
+                continue
+            if parent is not None and self._per_parent[parent] >= self.max_per_parent:
+                blocked.append(waiter)
+                continue
+            self._running += 1
+            if parent is not None:
+                self._per_parent[parent] += 1
+            future.set_result(None)
+
+        for waiter in blocked:
+            heapq.heappush(self._waiters, waiter)
+
 
 class BaseEnchantedDevice(BaseCustomDevice):
     """Class for Tuya devices which need to be unlocked by casting a 'spell'.
@@ -573,14 +2155,19 @@ class BaseEnchantedDevice(BaseCustomDevice):
     async def apply_custom_configuration(self, *args, **kwargs):
         """Hooks device configuration to apply custom configuration."""
         # cast Tuya spell
+        if self.tuya_spell_read_attributes or self.tuya_spell_data_query:
+            await TuyaSpellScheduler.for_device(self).cast(self, self.cast_spells)
+
+        # also apply custom configuration to clusters if defined
+        await super().apply_custom_configuration(*args, **kwargs)
+
+    async def cast_spells(self):
+        """Cast the enabled spells, the attribute read spell first."""
         if self.tuya_spell_read_attributes:
             await self.spell_attribute_reads()
         if self.tuya_spell_data_query:
             await self.spell_data_query()
 
-        # also apply custom configuration to clusters if defined
-        await super().apply_custom_configuration(*args, **kwargs)
-
     async def spell_attribute_reads(self):
         """Cast 'attribute read' spell, so the Tuya device works correctly."""
         self.debug(
@@ -611,19 +2198,19 @@ class TuyaOnOff(CustomCluster, OnOff):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.switch_bus.add_listener(self)
+        self.endpoint.device.switch_bus.add_channel_listener(
+            SWITCH_EVENT, self.endpoint.endpoint_id, self.switch_event
+        )
 
     def switch_event(self, channel, state):
-        """Switch event."""
+        """Switch event of the channel of this endpoint."""
         _LOGGER.debug(
             "%s - Received switch event message, channel: %d, state: %d",
             self.endpoint.device.ieee,
             channel,
             state,
         )
-        # update status only if event == endpoint
-        if self.endpoint.endpoint_id == channel:
-            self._update_attribute(ATTR_ON_OFF, state)
+        self._update_attribute(ATTR_ON_OFF, state)
 
     async def command(
         self,
@@ -672,15 +2259,22 @@ class TuyaManufacturerClusterOnOff(TuyaManufCluster):
 
         if hdr.command_id in (0x0002, 0x0001):
             # Send default response because the MCU expects it
-            if not hdr.frame_control.disable_default_response:
-                self.send_default_rsp(hdr, status=foundation.Status.SUCCESS)
+            answered = TuyaDefaultResponsePolicy.acknowledge(self, hdr)
 
             tuya_payload = args[0]
-            self.endpoint.device.switch_bus.listener_event(
+            handled = self.endpoint.device.switch_bus.listener_event(
                 SWITCH_EVENT,
                 tuya_payload.command_id - TUYA_CMD_BASE,
                 tuya_payload.data[1],
             )
+
+            if not answered:
+                status = (
+                    foundation.Status.SUCCESS
+                    if handled
+                    else foundation.Status.UNSUPPORTED_ATTRIBUTE
+                )
+                TuyaDefaultResponsePolicy.respond(self, hdr, status)
         elif hdr.command_id == TUYA_SET_TIME:
             """Time event call super"""
             _LOGGER.debug("TUYA_SET_TIME --> hdr: %s, args: %s", hdr, args)
@@ -694,20 +2288,23 @@ class TuyaSwitch(CustomDevice):
 
     def __init__(self, *args, **kwargs):
         """Init device."""
-        self.switch_bus = Bus()
+        self.switch_bus = TuyaBus()
         super().__init__(*args, **kwargs)
 
 
 class TuyaDimmerSwitch(TuyaSwitch):
     """Tuya dimmer switch device."""
 
+    # level datapoint of each gang, by channel (endpoint id)
+    tuya_level_datapoints: dict[int, int] = {1: TUYA_LEVEL_COMMAND}
+
     def __init__(self, *args, **kwargs):
         """Init device."""
-        self.dimmer_bus = Bus()
+        self.dimmer_bus = TuyaBus()
         super().__init__(*args, **kwargs)
 
 
-class TuyaThermostatCluster(LocalDataCluster, Thermostat):
+class TuyaThermostatCluster(BulkAttributeUpdateMixin, LocalDataCluster, Thermostat):
     """Thermostat cluster for Tuya thermostats."""
 
     _CONSTANT_ATTRIBUTES = {0x001B: Thermostat.ControlSequenceOfOperation.Heating_Only}
@@ -732,8 +2329,7 @@ class TuyaThermostatCluster(LocalDataCluster, Thermostat):
         else:
             mode = self.RunningMode.Heat
             state = self.RunningState.Heat_State_On
-        self._update_attribute(self.attributes_by_name["running_mode"].id, mode)
-        self._update_attribute(self.attributes_by_name["running_state"].id, state)
+        self.update_attributes({"running_mode": mode, "running_state": state})
 
     # pylint: disable=R0201
     def map_attribute(self, attribute, value):
@@ -759,14 +2355,14 @@ class TuyaThermostatCluster(LocalDataCluster, Thermostat):
 
             _LOGGER.debug(
                 "[0x%04x:%s:0x%04x] Mapping standard %s (0x%04x) "
-                "with value %s to custom %s",
+                "with value %r to custom %r",
                 self.endpoint.device.nwk,
                 self.endpoint.endpoint_id,
                 self.cluster_id,
                 attr_name,
                 record.attrid,
-                repr(record.value.value),
-                repr(new_attrs),
+                record.value.value,
+                new_attrs,
             )
 
             manufacturer_attrs.update(new_attrs)
@@ -876,14 +2472,14 @@ class TuyaUserInterfaceCluster(LocalDataCluster, UserInterface):
 
                 _LOGGER.debug(
                     "[0x%04x:%s:0x%04x] Mapping standard %s (0x%04x) "
-                    "with value %s to custom %s",
+                    "with value %r to custom %r",
                     self.endpoint.device.nwk,
                     self.endpoint.endpoint_id,
                     self.cluster_id,
                     attr_name,
                     record.attrid,
-                    repr(record.value.value),
-                    repr(new_attrs),
+                    record.value.value,
+                    new_attrs,
                 )
 
             manufacturer_attrs.update(new_attrs)
@@ -905,7 +2501,7 @@ class TuyaUserInterfaceCluster(LocalDataCluster, UserInterface):
         return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
 
 
-class TuyaLocalCluster(LocalDataCluster):
+class TuyaLocalCluster(BulkAttributeUpdateMixin, LocalDataCluster):
     """Tuya virtual clusters.
 
     Prevents attribute reads and writes. Attribute writes could be converted
@@ -1005,9 +2601,9 @@ class TuyaThermostat(CustomDevice):
 
     def __init__(self, *args, **kwargs):
         """Init device."""
-        self.thermostat_bus = Bus()
-        self.ui_bus = Bus()
-        self.battery_bus = Bus()
+        self.thermostat_bus = TuyaBus()
+        self.ui_bus = TuyaBus()
+        self.battery_bus = TuyaBus()
         super().__init__(*args, **kwargs)
 
 
@@ -1106,20 +2702,28 @@ class TuyaSmartRemoteOnOffCluster(OnOff, EventableCluster):
         self.last_tsn = hdr.tsn
 
         # send default response (as soon as possible), so avoid repeated zclframe from device
-        if not hdr.frame_control.disable_default_response:
-            self.debug("TS004X: send default response")
-            self.send_default_rsp(hdr, status=foundation.Status.SUCCESS)
+        answered = TuyaDefaultResponsePolicy.acknowledge(self, hdr)
         # handle command
+        status = foundation.Status.SUCCESS
         if hdr.command_id == 0xFC:
             rotate_type = args[0]
+            if rotate_type not in self.rotate_type:
+                status = foundation.Status.INVALID_VALUE
             self.listener_event(
                 ZHA_SEND_EVENT, self.rotate_type.get(rotate_type, "unknown"), []
             )
         elif hdr.command_id == 0xFD:
             press_type = args[0]
+            if press_type not in self.press_type:
+                status = foundation.Status.INVALID_VALUE
             self.listener_event(
                 ZHA_SEND_EVENT, self.press_type.get(press_type, "unknown"), []
             )
+        else:
+            status = foundation.Status.UNSUP_CLUSTER_COMMAND
+
+        if not answered:
+            TuyaDefaultResponsePolicy.respond(self, hdr, status)
 
 
 MULTIPLIER = 0x0301
@@ -1389,13 +2993,23 @@ class TuyaWindowCover(CustomDevice):
 
     def __init__(self, *args, **kwargs):
         """Init device."""
-        self.cover_bus = Bus()
+        self.cover_bus = TuyaBus()
         super().__init__(*args, **kwargs)
 
 
 class TuyaManufacturerLevelControl(TuyaManufCluster):
     """Manufacturer Specific Cluster for cover device."""
 
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        level_datapoints = getattr(
+            self.endpoint.device, "tuya_level_datapoints", {1: TUYA_LEVEL_COMMAND}
+        )
+        self._level_channels = {
+            datapoint: channel for channel, datapoint in level_datapoints.items()
+        }
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -1419,10 +3033,11 @@ class TuyaManufacturerLevelControl(TuyaManufCluster):
         )
 
         if hdr.command_id in (0x0002, 0x0001):
-            if tuya_payload.command_id == TUYA_LEVEL_COMMAND:
+            channel = self._level_channels.get(tuya_payload.command_id)
+            if channel is not None:
                 self.endpoint.device.dimmer_bus.listener_event(
                     LEVEL_EVENT,
-                    tuya_payload.command_id,
+                    channel,
                     tuya_payload.data,
                 )
             else:
@@ -1439,10 +3054,12 @@ class TuyaLevelControl(CustomCluster, LevelControl):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.dimmer_bus.add_listener(self)
+        self.endpoint.device.dimmer_bus.add_channel_listener(
+            LEVEL_EVENT, self.endpoint.endpoint_id, self.level_event
+        )
 
     def level_event(self, channel, state):
-        """Level event."""
+        """Level event of the channel of this endpoint."""
         level = (((state[3] << 8) + state[4]) * 255) // 1000
         _LOGGER.debug(
             "%s - Received level event message, channel: %d, level: %d, data: %d",
@@ -1476,7 +3093,12 @@ class TuyaLevelControl(CustomCluster, LevelControl):
             cmd_payload = TuyaManufCluster.Command()
             cmd_payload.status = 0
             cmd_payload.tsn = 0
-            cmd_payload.command_id = TUYA_LEVEL_COMMAND
+            level_datapoints = getattr(
+                self.endpoint.device, "tuya_level_datapoints", {}
+            )
+            cmd_payload.command_id = level_datapoints.get(
+                self.endpoint.endpoint_id, TUYA_LEVEL_COMMAND
+            )
             cmd_payload.function = 0
 
             if kwargs and "level" in kwargs:
@@ -1490,13 +3112,74 @@ class TuyaLevelControl(CustomCluster, LevelControl):
             val2 = brightness & 0xFF
             cmd_payload.data = [4, 0, 0, val1, val2]  # Custom Command
 
-            return self.endpoint.tuya_manufacturer.command(
+            # the gangs share the manufacturer cluster of endpoint 1
+            manufacturer_cluster = self.endpoint.device.endpoints[1].tuya_manufacturer
+            return manufacturer_cluster.command(
                 TUYA_SET_DATA, cmd_payload, expect_reply=True
             )
 
         return foundation.Status.UNSUP_CLUSTER_COMMAND
 
 
+@dataclasses.dataclass(frozen=True)
+class ReportPolicy:
+    """Suppression of unchanged or insignificant updates of a reported attribute.
+
+    An update is dropped before it reaches the attribute cache when it comes
+    less than `min_interval` seconds after the last accepted one, or when it
+    differs from the last accepted value by no more than `deadband` or by no
+    more than `relative` times that value. Non-numeric values are only dropped
+    when unchanged. An update is always accepted once `heartbeat` seconds have
+    passed since the last accepted one.
+    """
+
+    deadband: float = 0
+    relative: float = 0
+    min_interval: float = 0
+    heartbeat: float | None = None
+
+    def significant(self, last: Any, elapsed: float, value: Any) -> bool:
+        """Return True if `value` should replace `last`, accepted `elapsed` ago."""
+        if elapsed < self.min_interval:
+            return False
+        if self.heartbeat is not None and elapsed >= self.heartbeat:
+            return True
+        if value == last:
+            return False
+        try:
+            delta = abs(value - last)
+        except TypeError:
+            return True
+        return delta > self.deadband and delta > self.relative * abs(last)
+
+
+class ReportFilter:
+    """Last accepted value and time of attributes updated under a `ReportPolicy`."""
+
+    def __init__(self) -> None:
+        """Init filter."""
+        self._last: dict[Any, tuple[Any, float]] = {}
+
+    def accept(self, key: Any, policy: ReportPolicy, value: Any) -> bool:
+        """Return True and remember `value` if the update of `key` is significant."""
+        now = time.monotonic()
+        last = self._last.get(key)
+        if last is not None and not policy.significant(last[0], now - last[1], value):
+            return False
+        self._last[key] = (value, now)
+        return True
+
+
+def with_report_policy(mapping: Any, policy: ReportPolicy) -> Any:
+    """Filter the updates of a datapoint mapping with `policy` and return it.
+
+    Also applies to mapping classes whose constructor has no `report_policy`
+    argument, such as the `DPToAttributeMapping` of `zhaquirks.tuya.mcu`.
+    """
+    mapping.report_policy = policy
+    return mapping
+
+
 @dataclasses.dataclass
 class DPToAttributeMapping:
     """Container for datapoint to cluster attribute update mapping."""
@@ -1505,6 +3188,7 @@ class DPToAttributeMapping:
     attribute_name: str | tuple[str, ...]
     converter: Callable[[Any], Any] | None = None
     endpoint_id: int | None = None
+    report_policy: ReportPolicy | None = None
 
     def __init__(
         self,
@@ -1512,12 +3196,14 @@ class DPToAttributeMapping:
         attribute_name: str | tuple[str, ...],
         converter: Callable[[Any], Any] | None = None,
         endpoint_id: int | None = None,
+        report_policy: ReportPolicy | None = None,
     ):
         """Init DPToAttributeMapping."""
         self.ep_attribute = ep_attribute
         self.attribute_name = attribute_name
         self.converter = converter
         self.endpoint_id = endpoint_id
+        self.report_policy = report_policy
 
         if not isinstance(attribute_name, str):
             _LOGGER.debug(
@@ -1529,10 +3215,21 @@ class DPToAttributeMapping:
     def decompose_attributes(self) -> list[DPToAttributeMapping]:
         """Decompose attributes into multiple mappings."""
 
+        # the decomposed mappings are applied in turn to the same payload, so the
+        # last payload and its converted tuple are kept to convert it only once
+        last: list[Any] = [UNDEFINED, None]
+
         def wrap_converter(converter: Callable[[Any], Any] | None, attr_index: int):
             if converter is None:
                 return None
-            return lambda args: converter(args)[attr_index]
+
+            def convert(args):
+                if last[0] is not args:
+                    last[1] = converter(args)
+                    last[0] = args
+                return last[1][attr_index]
+
+            return convert
 
         if isinstance(self.attribute_name, tuple):
             return [
@@ -1541,6 +3238,7 @@ class DPToAttributeMapping:
                     attr_name,
                     wrap_converter(self.converter, attr_index),
                     self.endpoint_id,
+                    self.report_policy,
                 )
                 for attr_index, attr_name in enumerate(self.attribute_name)
             ]
@@ -1555,6 +3253,140 @@ class AttributeWithMask:
     mask: int
 
 
+@dataclasses.dataclass(frozen=True)
+class PackedField:
+    """Integer field of a packed RAW datapoint.
+
+    `width` is in bytes, 1 to 4 or 8. The decoded integer is multiplied by
+    `scale` and passed to `type`, when they are set.
+    """
+
+    name: str
+    offset: int
+    width: int = 1
+    signed: bool = False
+    scale: float = 1
+    type: Callable[[Any], Any] | None = None
+
+
+_PACKED_FIELD_CODES: Final = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+
+def _packed_field_decoder(
+    field: PackedField, index: int, byteorder: str
+) -> Callable[[tuple], Any]:
+    """Return the decoder of a field from the values unpacked for it at `index`."""
+    if field.width == 3:
+        high, low = (index, index + 1) if byteorder == "big" else (index + 1, index)
+        signed = field.signed
+
+        def unpacked(values: tuple) -> int:
+            value = values[high] << 16 | values[low]
+            return (value ^ 0x800000) - 0x800000 if signed else value
+
+    else:
+        unpacked = operator.itemgetter(index)
+
+    scale = field.scale
+    cast = field.type
+    if scale == 1 and cast is None:
+        return unpacked
+
+    def decode(values: tuple) -> Any:
+        value = unpacked(values)
+        if scale != 1:
+            value = value * scale
+        return value if cast is None else cast(value)
+
+    return decode
+
+
+def packed_converter(
+    *fields: PackedField,
+    byteorder: str = "big",
+    result: Callable[..., Any] | None = None,
+) -> Callable[[bytes], Any]:
+    """Compile a converter of packed RAW datapoints declared as a list of fields.
+
+    All fields are decoded with one ``unpack_from`` call of a precompiled
+    `struct.Struct`. The converter returns the field values in declaration
+    order, the value itself for a single field, or what `result` returns when
+    called with the values.
+    """
+    if byteorder not in ("big", "little"):
+        raise ValueError(f"Invalid byte order: {byteorder}")
+
+    fmt = ">" if byteorder == "big" else "<"
+    position = 0
+    index = 0
+    indexes: list[int] = [0] * len(fields)
+    plain = True
+
+    for field_index in sorted(range(len(fields)), key=lambda i: fields[i].offset):
+        field = fields[field_index]
+        if field.offset < position:
+            raise ValueError(f"Field {field.name} overlaps the previous field")
+        if field.offset > position:
+            fmt += f"{field.offset - position}x"
+
+        indexes[field_index] = index
+        if field.width == 3:
+            # no 24 bit struct format, unpacked as 8 and 16 bit integers
+            fmt += "BH" if byteorder == "big" else "HB"
+            index += 2
+            plain = False
+        elif field.width in _PACKED_FIELD_CODES:
+            code = _PACKED_FIELD_CODES[field.width]
+            fmt += code.lower() if field.signed else code
+            index += 1
+        else:
+            raise ValueError(f"Invalid width of field {field.name}: {field.width}")
+
+        if field.scale != 1 or field.type is not None:
+            plain = False
+        position = field.offset + field.width
+
+    unpack = struct.Struct(fmt).unpack_from
+    if (
+        result is None
+        and len(fields) > 1
+        and plain
+        and indexes == list(range(len(fields)))
+    ):
+        return unpack
+
+    if plain:
+        pick = operator.itemgetter(*indexes)
+    elif len(fields) == 1:
+        pick = _packed_field_decoder(fields[0], indexes[0], byteorder)
+    else:
+        decoders = [
+            _packed_field_decoder(field, index, byteorder)
+            for field, index in zip(fields, indexes, strict=True)
+        ]
+
+        def pick(values: tuple) -> tuple:
+            return tuple([decode(values) for decode in decoders])
+
+    if result is None:
+
+        def convert(data: bytes) -> Any:
+            return pick(unpack(data))
+
+    elif len(fields) == 1:
+
+        def convert(data: bytes) -> Any:
+            return result(pick(unpack(data)))
+
+    else:
+
+        def convert(data: bytes) -> Any:
+            return result(*pick(unpack(data)))
+
+    convert.__qualname__ = f"packed_converter.<{', '.join(f.name for f in fields)}>"
+    return convert
+
+
 class TuyaNewManufCluster(CustomCluster):
     """Tuya manufacturer specific cluster.
 
@@ -1571,6 +3403,13 @@ class TuyaNewManufCluster(CustomCluster):
     # command for writing datapoint values to the device, some use TUYA_SEND_DATA
     mcu_write_command: foundation.GeneralCommand | int | t.uint8_t = TUYA_SET_DATA
 
+    # coalescing window (seconds) and in-flight frame limit of datapoint writes
+    tuya_write_window: float = 0.0
+    tuya_max_in_flight: int = 4
+
+    # largest frame packing several datapoints, see set_all_gangs()
+    tuya_max_payload_size: int = TUYA_MAX_APS_PAYLOAD
+
     class AttributeDefs(BaseAttributeDefs):
         """Attribute Definitions."""
 
@@ -1665,6 +3504,36 @@ class TuyaNewManufCluster(CustomCluster):
                         cluster._VALID_ATTRIBUTES = set()
                     cluster._VALID_ATTRIBUTES.add(attr.id)
 
+        # bind datapoint handlers once instead of looking them up for every record
+        self._dp_handlers: dict[int, Callable[[TuyaDatapointData], Any]] = {}
+        for dp, dp_handler in self.data_point_handlers.items():
+            handler = getattr(self, dp_handler, None)
+            if handler is not None:
+                self._dp_handlers[dp] = handler
+
+        # per datapoint update plans, see _compile_dp_plan()
+        self._dp_plans: dict[int, list[tuple]] = {}
+        # on_off datapoint and cluster of each gang, see _gang_datapoints()
+        self._gangs: dict[int, tuple[int, Cluster]] | None = None
+        # last accepted values of attributes mapped with a report policy
+        self._report_filter = ReportFilter()
+
+        TuyaAttributeSnapshot.attach_later(self.endpoint.device)
+
+    def deserialize(
+        self, data: bytes
+    ) -> tuple[foundation.ZCLHeader, foundation.CommandSchema | bytes]:
+        """Deserialize a frame, recording it if the device is traced."""
+        TuyaFrameTrace.record(self, data)
+        profiler = TuyaProfiler.get(self)
+        if profiler is None:
+            return super().deserialize(data)
+
+        start = time.perf_counter_ns()
+        result = super().deserialize(data)
+        profiler.decoded(time.perf_counter_ns() - start)
+        return result
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -1684,10 +3553,9 @@ class TuyaNewManufCluster(CustomCluster):
             self.debug(
                 "Received unknown manufacturer command %s: %s", hdr.command_id, args
             )
-            if not hdr.frame_control.disable_default_response:
-                self.send_default_rsp(
-                    hdr, status=foundation.Status.UNSUP_CLUSTER_COMMAND
-                )
+            TuyaDefaultResponsePolicy.respond(
+                self, hdr, foundation.Status.UNSUP_CLUSTER_COMMAND
+            )
             return
 
         try:
@@ -1700,29 +3568,35 @@ class TuyaNewManufCluster(CustomCluster):
             )
             status = foundation.Status.UNSUP_CLUSTER_COMMAND
 
-        if not hdr.frame_control.disable_default_response:
-            self.send_default_rsp(hdr, status=status)
+        TuyaDefaultResponsePolicy.respond(self, hdr, status)
 
     def handle_get_data(self, command: TuyaCommand) -> foundation.Status:
         """Handle get_data response (report)."""
         dp_error = False
+        profiler = TuyaProfiler.get(self)
         for record in command.datapoints:
+            start = time.perf_counter_ns() if profiler is not None else 0
+            known = True
             try:
-                dp_handler = self.data_point_handlers[record.dp]
-                getattr(self, dp_handler)(record)
+                self._dp_handlers[record.dp](record)
             except (AttributeError, KeyError):
                 self.debug("No datapoint handler for %s", record)
                 dp_error = True
+                known = False
                 # return foundation.Status.UNSUPPORTED_ATTRIBUTE
+            if profiler is not None:
+                profiler.handled(record.dp, time.perf_counter_ns() - start, known)
 
-        _LOGGER.debug(
-            "[0x%04x:%s:0x%04x] Received value %s for attribute 0x%04x",
-            self.endpoint.device.nwk,
-            self.endpoint.endpoint_id,
-            self.cluster_id,
-            record.data.payload,
-            record.dp,
-        )
+            # the payload is only decoded here if logging needs it
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "[0x%04x:%s:0x%04x] Received value %s for attribute 0x%04x",
+                    self.endpoint.device.nwk,
+                    self.endpoint.endpoint_id,
+                    self.cluster_id,
+                    record.data.payload,
+                    record.dp,
+                )
 
         return (
             foundation.Status.SUCCESS
@@ -1733,30 +3607,161 @@ class TuyaNewManufCluster(CustomCluster):
     handle_set_data_response = handle_get_data
     handle_active_status_report = handle_get_data
 
+    async def command(
+        self,
+        command_id: foundation.GeneralCommand | int | t.uint8_t,
+        *args,
+        **kwargs: Any,
+    ):
+        """Send a command, queueing datapoint writes in the device write queue.
+
+        A write of the same datapoints still pending in the queue, as issued by
+        `TuyaMCUCluster.tuya_mcu_command`, is superseded by this one and gets
+        its result.
+        """
+        if (
+            command_id != self.mcu_write_command
+            or len(args) != 1
+            or not isinstance(args[0], TuyaCommand)
+        ):
+            return await super().command(command_id, *args, **kwargs)
+
+        send_command = super().command
+        key = ("dp", tuple(datapoint.dp for datapoint in args[0].datapoints))
+        return await TuyaWriteQueue.for_cluster(self).write(
+            self, key, lambda: send_command(command_id, *args, **kwargs)
+        )
+
     def handle_set_time_request(self, payload: t.uint16_t) -> foundation.Status:
         """Handle Time set request."""
         return foundation.Status.SUCCESS
 
-    def _dp_2_attr_update(self, datapoint: TuyaDatapointData) -> None:
-        """Handle data point to attribute report conversion."""
+    def _gang_datapoints(self) -> dict[int, tuple[int, Cluster]]:
+        """Return the on_off datapoint and cluster of each gang, by endpoint id.
+
+        Built on first use, as the mapped clusters might not exist yet while this
+        cluster is initialized. Gangs whose endpoint or cluster is missing in the
+        quirk are left out.
+        """
+        if self._gangs is not None:
+            return self._gangs
+
+        self._gangs = {}
+        for dp, dp_map in self._dp_to_attributes.items():
+            for mapped_attr in dp_map:
+                if (
+                    mapped_attr.ep_attribute != OnOff.ep_attribute
+                    or mapped_attr.attribute_name != OnOff.AttributeDefs.on_off.name
+                ):
+                    continue
+                endpoint_id = mapped_attr.endpoint_id or self.endpoint.endpoint_id
+                endpoint = self.endpoint.device.endpoints.get(endpoint_id)
+                cluster = getattr(endpoint, OnOff.ep_attribute, None)
+                if cluster is not None:
+                    self._gangs.setdefault(endpoint_id, (dp, cluster))
+        return self._gangs
+
+    async def set_all_gangs(
+        self, state: bool, manufacturer: int | None = None
+    ) -> list[Any]:
+        """Switch all gangs on or off in as few frames as possible.
+
+        The on_off datapoints of all gangs are packed in `mcu_write_command`
+        frames of at most `tuya_max_payload_size` bytes, instead of one frame per
+        gang. Return the results of the frames sent.
+        """
+        gangs = self._gang_datapoints()
+        datapoints = [
+            TuyaDatapointData(dp, TuyaData(t.Bool(state))) for dp, _ in gangs.values()
+        ]
+
+        # room left after the ZCL header and the Tuya command status and tsn
+        header_size = 5 if manufacturer is not None else 3
+        budget = self.tuya_max_payload_size - header_size - 2
+
+        results = await asyncio.gather(
+            *(
+                self.command(
+                    self.mcu_write_command,
+                    TuyaCommand(
+                        status=0,
+                        tsn=self.endpoint.device.application.get_sequence(),
+                        datapoints=batch,
+                    ),
+                    manufacturer=manufacturer,
+                )
+                for batch in pack_datapoints(datapoints, budget)
+            )
+        )
+
+        for _, cluster in gangs.values():
+            cluster.update_attribute(OnOff.AttributeDefs.on_off.name, state)
+        return list(results)
+
+    def _compile_dp_plan(self, dp: int) -> list[tuple] | None:
+        """Resolve the target clusters and attributes a datapoint updates.
+
+        Plans are built on first use, as the mapped clusters might not exist yet
+        while this cluster is initialized. Each step of a plan is a tuple of
+        (cluster, attribute name, converter, update callable, report policy).
+        """
         try:
-            dp_map = self._dp_to_attributes[datapoint.dp]
+            dp_map = self._dp_to_attributes[dp]
         except KeyError:
-            self.debug("No attribute mapping for %s data point", datapoint.dp)
-            return
+            self.debug("No attribute mapping for %s data point", dp)
+            return None
 
+        plan = []
         endpoint = self.endpoint
         for mapped_attr in dp_map:
             if mapped_attr.endpoint_id:
                 endpoint = self.endpoint.device.endpoints[mapped_attr.endpoint_id]
             cluster = getattr(endpoint, mapped_attr.ep_attribute)
-            value = datapoint.data.payload
-            if mapped_attr.converter:
-                value = mapped_attr.converter(value)
 
-            if isinstance(value, AttributeWithMask):
-                value = (
-                    cluster.get(mapped_attr.attribute_name, 0) & (~value.mask)
-                    | value.value
+            # skip the name lookup of TuyaLocalCluster.update_attribute, but keep
+            # calling clusters which implement their own update_attribute()
+            attr = cluster.attributes_by_name.get(mapped_attr.attribute_name)
+            if (
+                attr is not None
+                and getattr(cluster.update_attribute, "__func__", None)
+                is TuyaLocalCluster.update_attribute
+            ):
+                update = functools.partial(cluster._update_attribute, attr.id)
+            else:
+                update = functools.partial(
+                    cluster.update_attribute, mapped_attr.attribute_name
+                )
+
+            plan.append(
+                (
+                    cluster,
+                    mapped_attr.attribute_name,
+                    mapped_attr.converter,
+                    update,
+                    getattr(mapped_attr, "report_policy", None),
                 )
-            cluster.update_attribute(mapped_attr.attribute_name, value)
+            )
+
+        self._dp_plans[dp] = plan
+        return plan
+
+    def _dp_2_attr_update(self, datapoint: TuyaDatapointData) -> None:
+        """Handle data point to attribute report conversion."""
+        try:
+            plan = self._dp_plans[datapoint.dp]
+        except KeyError:
+            plan = self._compile_dp_plan(datapoint.dp)
+            if plan is None:
+                return
+
+        payload = datapoint.data.payload
+        for cluster, attr_name, converter, update, policy in plan:
+            value = payload if converter is None else converter(payload)
+
+            if isinstance(value, AttributeWithMask):
+                value = cluster.get(attr_name, 0) & (~value.mask) | value.value
+            if policy is not None and not self._report_filter.accept(
+                (cluster, attr_name), policy, value
+            ):
+                continue
+            update(value)
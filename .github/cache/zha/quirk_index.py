@@ -0,0 +1,137 @@
+"""Signature index for matching devices against v1 quirks.
+
+The quirk registry narrows candidates down by manufacturer and model, then
+compares the endpoints of every candidate signature with the device. Many
+Tuya (manufacturer, model) pairs are shared by dozens of quirks, so the index
+additionally keys candidates on a fingerprint of the endpoint/cluster layout,
+which every v1 signature fully specifies. Only profile, device type and node
+descriptor are left to be checked on the (usually single) candidate.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+import inspect
+from types import ModuleType
+from typing import Any
+
+import zigpy.device
+
+from zhaquirks.const import (
+    ENDPOINTS,
+    INPUT_CLUSTERS,
+    MANUFACTURER,
+    MODEL,
+    MODELS_INFO,
+    OUTPUT_CLUSTERS,
+)
+from zhaquirks.legacy import CustomDevice, signature_matches
+
+Fingerprint = frozenset[tuple[int, frozenset[int], frozenset[int]]]
+
+
+def signature_fingerprint(endpoints: Mapping[int, Mapping[str, Any]]) -> Fingerprint:
+    """Fingerprint of the endpoints of a quirk signature."""
+    return frozenset(
+        (
+            endpoint_id,
+            frozenset(endpoint.get(INPUT_CLUSTERS, ())),
+            frozenset(endpoint.get(OUTPUT_CLUSTERS, ())),
+        )
+        for endpoint_id, endpoint in endpoints.items()
+    )
+
+
+def device_fingerprint(device: zigpy.device.Device) -> Fingerprint:
+    """Fingerprint of the endpoints of a device, ZDO excluded."""
+    return frozenset(
+        (
+            endpoint_id,
+            frozenset(endpoint.in_clusters),
+            frozenset(endpoint.out_clusters),
+        )
+        for endpoint_id, endpoint in device.endpoints.items()
+        if endpoint_id != 0
+    )
+
+
+class QuirkSignatureIndex:
+    """Index of v1 quirks keyed on (manufacturer, model) and endpoint fingerprint."""
+
+    def __init__(self) -> None:
+        """Init an empty index."""
+        self._index: dict[
+            tuple[str | None, str | None], dict[Fingerprint, list[type[CustomDevice]]]
+        ] = defaultdict(lambda: defaultdict(list))
+        self._matchers: dict[type[CustomDevice], Any] = {}
+
+    @classmethod
+    def from_quirks(cls, quirks: Iterable[type[CustomDevice]]) -> QuirkSignatureIndex:
+        """Build an index of the given quirks."""
+        index = cls()
+        for quirk in quirks:
+            index.add(quirk)
+        return index
+
+    @classmethod
+    def from_modules(cls, modules: Iterable[ModuleType]) -> QuirkSignatureIndex:
+        """Build an index of the quirks defined in the given modules."""
+        return cls.from_quirks(
+            quirk
+            for module in modules
+            for _, quirk in inspect.getmembers(module, inspect.isclass)
+            if issubclass(quirk, CustomDevice)
+            and quirk.__module__ == module.__name__
+            and ENDPOINTS in (getattr(quirk, "signature", None) or {})
+        )
+
+    def __len__(self) -> int:
+        """Return the number of indexed quirks."""
+        return len(self._matchers)
+
+    def add(self, quirk: type[CustomDevice]) -> None:
+        """Add a quirk to the index.
+
+        Like the quirk registry, quirks added later take precedence.
+        """
+        signature = quirk.signature
+        models_info = signature.get(MODELS_INFO) or [
+            (signature.get(MANUFACTURER), signature.get(MODEL))
+        ]
+        fingerprint = signature_fingerprint(signature[ENDPOINTS])
+
+        for manufacturer, model in models_info:
+            candidates = self._index[(manufacturer, model)][fingerprint]
+            if quirk not in candidates:
+                candidates.insert(0, quirk)
+
+        self._matchers[quirk] = signature_matches(signature)
+
+    def candidates(
+        self,
+        manufacturer: str | None,
+        model: str | None,
+        fingerprint: Fingerprint,
+    ) -> list[type[CustomDevice]]:
+        """Return quirks with a signature of the same manufacturer, model and layout."""
+        candidates = []
+        for key in (
+            (manufacturer, model),
+            (manufacturer, None),
+            (None, model),
+            (None, None),
+        ):
+            by_fingerprint = self._index.get(key)
+            if by_fingerprint is not None:
+                candidates.extend(by_fingerprint.get(fingerprint, ()))
+        return candidates
+
+    def get_quirk(self, device: zigpy.device.Device) -> type[CustomDevice] | None:
+        """Return the quirk matching the device, if any."""
+        for quirk in self.candidates(
+            device.manufacturer, device.model, device_fingerprint(device)
+        ):
+            if self._matchers[quirk](device):
+                return quirk
+        return None
@@ -0,0 +1,238 @@
+"""Manifest of the devices handled by each quirk module, for lazy loading.
+
+Importing every quirk module builds all of their clusters, enums and quirk
+builder chains, although an installation usually only has devices of a few
+manufacturers. The manifest maps (manufacturer, model) to the modules with a
+quirk for it. It is generated from the ``MODELS_INFO``/``MANUFACTURER``/``MODEL``
+signature entries and the ``QuirkBuilder``/``TuyaQuirkBuilder``/``applies_to``
+calls in the module sources, without importing them.
+
+Regenerate the manifest after changing quirk modules::
+
+    python -m zhaquirks.tuya.quirk_manifest
+"""
+
+from __future__ import annotations
+
+import ast
+from collections.abc import Iterable
+import importlib
+import json
+import logging
+import pathlib
+from types import ModuleType
+from typing import Any
+
+from zha.quirks import DEVICE_REGISTRY as ZHA_DEVICE_REGISTRY, DeviceRegistry
+import zigpy.device
+import zigpy.quirks
+
+_LOGGER = logging.getLogger(__name__)
+
+MANIFEST_PATH = pathlib.Path(__file__).with_name("quirk_manifest.json")
+MANIFEST_VERSION = 1
+
+# manufacturer key of quirks matching any manufacturer, or one that could not
+# be resolved from the module source
+ANY_MANUFACTURER = "*"
+
+_BUILDERS = ("QuirkBuilder", "TuyaQuirkBuilder")
+_BUILDER_METHODS = ("applies_to", "also_applies_to")
+_SKIPPED_MODULES = ("__init__", "quirk_index", "quirk_manifest")
+
+
+def _constants(tree: ast.Module) -> dict[str, str]:
+    """Return the module level string constants of a module."""
+    constants = {}
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        ):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = node.value.value
+    return constants
+
+
+def _string(node: ast.AST | None, constants: dict[str, str]) -> str | None:
+    """Return the value of a string literal or constant, None if unknown."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    return None
+
+
+def _key_name(node: ast.AST | None) -> str | None:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def scan_source(source: str) -> tuple[set[tuple[str | None, str]], bool]:
+    """Return the (manufacturer, model) pairs quirked by a module source.
+
+    The manufacturer is None when it can't be resolved statically, for
+    example when it's imported from another module. The second item is False
+    if the module has a quirk whose model can't be resolved, so the module
+    can't be loaded lazily.
+    """
+    tree = ast.parse(source)
+    constants = _constants(tree)
+    pairs: set[tuple[str | None, str]] = set()
+    complete = True
+
+    def add(manufacturer: ast.AST | None, model: ast.AST | None) -> None:
+        nonlocal complete
+        model_name = _string(model, constants)
+        if model_name is None:
+            complete = False
+            return
+        pairs.add((_string(manufacturer, constants), model_name))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Dict):
+            entries = {
+                _key_name(key): value
+                for key, value in zip(node.keys, node.values, strict=True)
+                if key is not None
+            }
+            if "MODELS_INFO" in entries:
+                models_info = entries["MODELS_INFO"]
+                if isinstance(models_info, (ast.List, ast.Tuple)):
+                    for item in models_info.elts:
+                        if isinstance(item, ast.Tuple) and len(item.elts) == 2:
+                            add(*item.elts)
+                        else:
+                            complete = False
+                elif not isinstance(models_info, ast.Subscript):
+                    # `Other.signature[MODELS_INFO]` reuses models listed
+                    # elsewhere in the module
+                    complete = False
+            elif "MODEL" in entries and "ENDPOINTS" in entries:
+                add(entries.get("MANUFACTURER"), entries["MODEL"])
+        elif isinstance(node, ast.Call):
+            name = _key_name(node.func)
+            if (name in _BUILDERS and node.args) or (
+                name in _BUILDER_METHODS and isinstance(node.func, ast.Attribute)
+            ):
+                add(*(node.args + [None, None])[:2])
+
+    return pairs, complete
+
+
+def build_manifest(directory: pathlib.Path) -> dict[str, Any]:
+    """Build the manifest of the quirk modules in a directory."""
+    models: dict[str, dict[str, list[str]]] = {}
+    eager = []
+
+    for path in sorted(directory.glob("*.py")):
+        if path.stem in _SKIPPED_MODULES:
+            continue
+        pairs, complete = scan_source(path.read_text(encoding="utf-8"))
+        if not complete or not pairs:
+            eager.append(path.stem)
+            continue
+        for manufacturer, model in pairs:
+            modules = models.setdefault(model, {}).setdefault(
+                manufacturer or ANY_MANUFACTURER, []
+            )
+            if path.stem not in modules:
+                modules.append(path.stem)
+
+    return {
+        "version": MANIFEST_VERSION,
+        "eager": eager,
+        "models": {
+            model: dict(sorted(by_manufacturer.items()))
+            for model, by_manufacturer in sorted(models.items())
+        },
+    }
+
+
+class LazyQuirkLoader:
+    """Import quirk modules only once a device they handle appears."""
+
+    def __init__(self, manifest: dict[str, Any], package: str = __package__) -> None:
+        """Init the loader from a manifest."""
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {manifest.get('version')}")
+        self._package = package
+        self._eager: list[str] = manifest["eager"]
+        self._models: dict[str, dict[str, list[str]]] = manifest["models"]
+        self.loaded: dict[str, ModuleType] = {}
+
+    @classmethod
+    def from_file(
+        cls, path: pathlib.Path = MANIFEST_PATH, package: str = __package__
+    ) -> LazyQuirkLoader:
+        """Init the loader from a manifest file."""
+        return cls(json.loads(path.read_text(encoding="utf-8")), package)
+
+    def modules_for(self, manufacturer: str | None, model: str | None) -> list[str]:
+        """Return the modules with a quirk for the manufacturer and model."""
+        by_manufacturer = self._models.get(model)
+        if not by_manufacturer:
+            return []
+        return [
+            *by_manufacturer.get(manufacturer, ()),
+            *by_manufacturer.get(ANY_MANUFACTURER, ()),
+        ]
+
+    def _import(self, names: Iterable[str]) -> list[ModuleType]:
+        modules = []
+        for name in names:
+            module = self.loaded.get(name)
+            if module is None:
+                _LOGGER.debug("Loading quirk module %s", name)
+                module = importlib.import_module(f"{self._package}.{name}")
+                self.loaded[name] = module
+            modules.append(module)
+        return modules
+
+    def load_eager(self) -> list[ModuleType]:
+        """Import the modules that can't be loaded lazily."""
+        return self._import(self._eager)
+
+    def load_for(self, manufacturer: str | None, model: str | None) -> list[ModuleType]:
+        """Import the modules with a quirk for the manufacturer and model."""
+        return self._import(self.modules_for(manufacturer, model))
+
+    def get_device(
+        self,
+        device: zigpy.device.Device,
+        registry: zigpy.quirks.DeviceRegistry | None = None,
+        v2_registry: DeviceRegistry | None = None,
+    ) -> zigpy.device.Device:
+        """Load the quirks for a device, then look it up in the quirk registries.
+
+        v1 quirks are looked up in `registry`, the zigpy one by default. Quirks
+        v2, which most builder modules define and which only register with ZHA,
+        are looked up in `v2_registry`, the ZHA one by default, if no v1 quirk
+        matches.
+        """
+        self.load_for(device.manufacturer, device.model)
+        quirked = zigpy.quirks.get_device(device, registry)
+        if quirked is not device:
+            return quirked
+        return (v2_registry or ZHA_DEVICE_REGISTRY).resolve(device)
+
+
+def main() -> None:
+    """Regenerate the manifest next to this module."""
+    manifest = build_manifest(MANIFEST_PATH.parent)
+    MANIFEST_PATH.write_text(
+        json.dumps(manifest, indent=2, sort_keys=False) + "\n", encoding="utf-8"
+    )
+    print(
+        f"{MANIFEST_PATH.name}: {len(manifest['models'])} models, "
+        f"{len(manifest['eager'])} eager modules"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,10 @@ from zhaquirks.const import (
     PROFILE_ID,
 )
 from zhaquirks.legacy import CustomDevice
+from zhaquirks.tuya import TimerWheelResetMixin
 
 
-class MotionCluster(MotionWithReset):
+class MotionCluster(TimerWheelResetMixin, MotionWithReset):
     """Motion cluster."""
 
     reset_s: int = 60
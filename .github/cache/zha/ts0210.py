@@ -17,13 +17,13 @@ from zhaquirks.const import (
     PROFILE_ID,
 )
 from zhaquirks.legacy import CustomDevice
-from zhaquirks.tuya import Command as TuyaCommand
+from zhaquirks.tuya import Command as TuyaCommand, TimerWheelResetMixin
 
 ZONE_TYPE = 0x0001
 IAS_VIBRATION_SENSOR = 0x5F02
 
 
-class VibrationCluster(LocalDataCluster, MotionOnEvent, IasZone):
+class VibrationCluster(TimerWheelResetMixin, LocalDataCluster, MotionOnEvent, IasZone):
     """Tuya Motion Sensor."""
 
     _CONSTANT_ATTRIBUTES = {ZONE_TYPE: IasZone.ZoneType.Vibration_Movement_Sensor}
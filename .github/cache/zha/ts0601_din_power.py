@@ -9,7 +9,7 @@ from zigpy.zcl.clusters.homeautomation import ElectricalMeasurement
 from zigpy.zcl.clusters.smartenergy import Metering
 from zigpy.zcl.foundation import ZCLAttributeDef
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import Bus
 from zhaquirks.builder import (
     PERCENTAGE,
     SensorDeviceClass,
@@ -25,6 +25,8 @@ from zhaquirks.const import (
     PROFILE_ID,
 )
 from zhaquirks.tuya import (
+    ReportFilter,
+    ReportPolicy,
     TuyaLocalCluster,
     TuyaManufClusterAttributes,
     TuyaOnOff,
@@ -90,7 +92,7 @@ class TuyaManufClusterDinPower(TuyaManufClusterAttributes):
             )
 
 
-class TuyaPowerMeasurement(LocalDataCluster, ElectricalMeasurement):
+class TuyaPowerMeasurement(TuyaLocalCluster, ElectricalMeasurement):
     """Custom class for power, voltage and current measurement."""
 
     POWER_ID = 0x050B
@@ -113,13 +115,32 @@ class TuyaPowerMeasurement(LocalDataCluster, ElectricalMeasurement):
         AC_FREQUENCY_DIVISOR: 100,
     }
 
+    # voltage, current and power are reported every few seconds, mostly unchanged
+    REPORT_POLICIES = {
+        VOLTAGE_ID: ReportPolicy(deadband=0.5, heartbeat=300),  # V
+        CURRENT_ID: ReportPolicy(deadband=10, relative=0.02, heartbeat=300),  # mA
+        POWER_ID: ReportPolicy(deadband=1, relative=0.02, heartbeat=300),  # W
+    }
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._report_filter = ReportFilter()
+
+    def _significant(self, attrid, value):
+        """Return False if the report policy of the attribute drops the value."""
+        policy = self.REPORT_POLICIES.get(attrid)
+        return policy is None or self._report_filter.accept(attrid, policy, value)
+
     def voltage_reported(self, value):
         """Voltage reported."""
-        self._update_attribute(self.VOLTAGE_ID, value)
+        if self._significant(self.VOLTAGE_ID, value):
+            self._update_attribute(self.VOLTAGE_ID, value)
 
     def power_reported(self, value):
         """Power reported."""
-        self._update_attribute(self.POWER_ID, value)
+        if self._significant(self.POWER_ID, value):
+            self._update_attribute(self.POWER_ID, value)
 
     def power_factor_reported(self, value):
         """Power Factor reported."""
@@ -131,7 +152,21 @@ class TuyaPowerMeasurement(LocalDataCluster, ElectricalMeasurement):
 
     def current_reported(self, value):
         """Ampers reported."""
-        self._update_attribute(self.CURRENT_ID, value)
+        if self._significant(self.CURRENT_ID, value):
+            self._update_attribute(self.CURRENT_ID, value)
+
+    def current_voltage_reported(self, current, voltage):
+        """Ampers and voltage reported together."""
+        self.update_attributes(
+            {
+                attrid: value
+                for attrid, value in (
+                    (self.CURRENT_ID, current),
+                    (self.VOLTAGE_ID, voltage),
+                )
+                if self._significant(attrid, value)
+            }
+        )
 
     def frequency_reported(self, value):
         """AC Frequency reported."""
@@ -142,7 +177,7 @@ class TuyaPowerMeasurement(LocalDataCluster, ElectricalMeasurement):
         self._update_attribute(self.TOTAL_REACTIVE_POWER_ID, value)
 
 
-class TuyaElectricalMeasurement(LocalDataCluster, Metering):
+class TuyaElectricalMeasurement(TuyaLocalCluster, Metering):
     """Custom class for total energy measurement."""
 
     CURRENT_DELIVERED_ID = 0x0000
@@ -210,9 +245,8 @@ class HikingManufClusterDinPower(TuyaManufClusterAttributes):
         elif attrid == HIKING_TOTAL_ENERGY_RECEIVED_ATTR:
             self.endpoint.smartenergy_metering.energy_receive_reported(value / 100)
         elif attrid == HIKING_VOLTAGE_CURRENT_ATTR:
-            self.endpoint.electrical_measurement.current_reported(value >> 16)
-            self.endpoint.electrical_measurement.voltage_reported(
-                (value & 0x0000FFFF) / 10
+            self.endpoint.electrical_measurement.current_voltage_reported(
+                value >> 16, (value & 0x0000FFFF) / 10
             )
         elif attrid == HIKING_POWER_ATTR:
             self.endpoint.electrical_measurement.power_reported(value)
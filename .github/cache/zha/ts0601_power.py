@@ -14,10 +14,21 @@ from zhaquirks.builder import (
     UnitOfPower,
     UnitOfTime,
 )
-from zhaquirks.tuya import TuyaLocalCluster
+from zhaquirks.tuya import (
+    PackedField,
+    ReportPolicy,
+    TuyaLocalCluster,
+    packed_converter,
+    with_report_policy,
+)
 from zhaquirks.tuya.builder import TuyaQuirkBuilder
 from zhaquirks.tuya.mcu import DPToAttributeMapping
 
+# voltage, current and power are reported every few seconds, mostly unchanged
+VOLTAGE_REPORT_POLICY = ReportPolicy(deadband=5, heartbeat=300)  # 0.5 V
+CURRENT_REPORT_POLICY = ReportPolicy(deadband=10, relative=0.02, heartbeat=300)  # 10 mA
+POWER_REPORT_POLICY = ReportPolicy(deadband=1, relative=0.02, heartbeat=300)  # 1 W
+
 
 def dp_to_power(data: bytes) -> int:
     """Convert DP data to power value."""
@@ -28,24 +39,20 @@ def dp_to_power(data: bytes) -> int:
     return power
 
 
-def multi_dp_to_power(data: bytes) -> int:
-    """Convert DP data to power value."""
-    # Support negative power readings
+def _negative_power(power: int) -> int:
+    """Support negative power readings."""
     # From https://github.com/Koenkk/zigbee2mqtt/issues/18603#issuecomment-2277697295
-    power = data[7] | (data[6] << 8)
     if power > 0x7FFF:
         power = (0x999A - power) * -1
     return power
 
 
-def multi_dp_to_current(data: bytes) -> int:
-    """Convert DP data to current value."""
-    return data[4] | (data[3] << 8)
-
-
-def multi_dp_to_voltage(data: bytes) -> int:
-    """Convert DP data to voltage value."""
-    return data[1] | (data[0] << 8)
+# voltage, current and power of a phase, packed in one RAW datapoint
+multi_dp_to_power = packed_converter(
+    PackedField("active_power", offset=6, width=2, type=_negative_power)
+)
+multi_dp_to_current = packed_converter(PackedField("rms_current", offset=3, width=2))
+multi_dp_to_voltage = packed_converter(PackedField("rms_voltage", offset=0, width=2))
 
 
 class Tuya3PhaseElectricalMeasurement(ElectricalMeasurement, TuyaLocalCluster):
@@ -141,60 +148,87 @@ class Tuya3PhaseElectricalMeasurement(ElectricalMeasurement, TuyaLocalCluster):
     .tuya_dp_multi(
         dp_id=6,
         attribute_mapping=[
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="active_power",
-                converter=multi_dp_to_power,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="active_power",
+                    converter=multi_dp_to_power,
+                ),
+                POWER_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_voltage",
-                converter=multi_dp_to_voltage,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_voltage",
+                    converter=multi_dp_to_voltage,
+                ),
+                VOLTAGE_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_current",
-                converter=multi_dp_to_current,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_current",
+                    converter=multi_dp_to_current,
+                ),
+                CURRENT_REPORT_POLICY,
             ),
         ],
     )
     .tuya_dp_multi(
         dp_id=7,
         attribute_mapping=[
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="active_power_ph_b",
-                converter=multi_dp_to_power,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="active_power_ph_b",
+                    converter=multi_dp_to_power,
+                ),
+                POWER_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_voltage_ph_b",
-                converter=multi_dp_to_voltage,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_voltage_ph_b",
+                    converter=multi_dp_to_voltage,
+                ),
+                VOLTAGE_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_current_ph_b",
-                converter=multi_dp_to_current,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_current_ph_b",
+                    converter=multi_dp_to_current,
+                ),
+                CURRENT_REPORT_POLICY,
             ),
         ],
     )
     .tuya_dp_multi(
         dp_id=8,
         attribute_mapping=[
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="active_power_ph_c",
-                converter=multi_dp_to_power,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="active_power_ph_c",
+                    converter=multi_dp_to_power,
+                ),
+                POWER_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_voltage_ph_c",
-                converter=multi_dp_to_voltage,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_voltage_ph_c",
+                    converter=multi_dp_to_voltage,
+                ),
+                VOLTAGE_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_current_ph_c",
-                converter=multi_dp_to_current,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_current_ph_c",
+                    converter=multi_dp_to_current,
+                ),
+                CURRENT_REPORT_POLICY,
             ),
         ],
     )
@@ -452,60 +486,87 @@ class Tuya3PhaseElectricalMeasurement(ElectricalMeasurement, TuyaLocalCluster):
     .tuya_dp_multi(
         dp_id=6,
         attribute_mapping=[
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="active_power",
-                converter=multi_dp_to_power,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="active_power",
+                    converter=multi_dp_to_power,
+                ),
+                POWER_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_voltage",
-                converter=multi_dp_to_voltage,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_voltage",
+                    converter=multi_dp_to_voltage,
+                ),
+                VOLTAGE_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_current",
-                converter=multi_dp_to_current,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_current",
+                    converter=multi_dp_to_current,
+                ),
+                CURRENT_REPORT_POLICY,
             ),
         ],
     )
     .tuya_dp_multi(
         dp_id=7,
         attribute_mapping=[
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="active_power_ph_b",
-                converter=multi_dp_to_power,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="active_power_ph_b",
+                    converter=multi_dp_to_power,
+                ),
+                POWER_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_voltage_ph_b",
-                converter=multi_dp_to_voltage,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_voltage_ph_b",
+                    converter=multi_dp_to_voltage,
+                ),
+                VOLTAGE_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_current_ph_b",
-                converter=multi_dp_to_current,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_current_ph_b",
+                    converter=multi_dp_to_current,
+                ),
+                CURRENT_REPORT_POLICY,
             ),
         ],
     )
     .tuya_dp_multi(
         dp_id=8,
         attribute_mapping=[
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="active_power_ph_c",
-                converter=multi_dp_to_power,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="active_power_ph_c",
+                    converter=multi_dp_to_power,
+                ),
+                POWER_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_voltage_ph_c",
-                converter=multi_dp_to_voltage,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_voltage_ph_c",
+                    converter=multi_dp_to_voltage,
+                ),
+                VOLTAGE_REPORT_POLICY,
             ),
-            DPToAttributeMapping(
-                ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
-                attribute_name="rms_current_ph_c",
-                converter=multi_dp_to_current,
+            with_report_policy(
+                DPToAttributeMapping(
+                    ep_attribute=Tuya3PhaseElectricalMeasurement.ep_attribute,
+                    attribute_name="rms_current_ph_c",
+                    converter=multi_dp_to_current,
+                ),
+                CURRENT_REPORT_POLICY,
             ),
         ],
     )
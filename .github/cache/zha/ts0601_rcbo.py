@@ -27,7 +27,15 @@ from zhaquirks.const import (
     PROFILE_ID,
 )
 from zhaquirks.legacy import CustomDevice
-from zhaquirks.tuya import TUYA_MCU_COMMAND, AttributeWithMask, PowerOnState
+from zhaquirks.tuya import (
+    TUYA_MCU_COMMAND,
+    AttributeWithMask,
+    PackedField,
+    PowerOnState,
+    ReportPolicy,
+    packed_converter,
+    with_report_policy,
+)
 from zhaquirks.tuya.mcu import (
     DPToAttributeMapping,
     TuyaAttributesCluster,
@@ -61,6 +69,11 @@ TUYA_DP_TOTAL_REVERSE_ACTIVE_POWER = 117
 TUYA_DP_HISTORICAL_VOLTAGE = 118
 TUYA_DP_HISTORICAL_CURRENT = 119
 
+# voltage, current and power are reported every few seconds, mostly unchanged
+VOLTAGE_REPORT_POLICY = ReportPolicy(deadband=5, heartbeat=300)  # 0.5 V
+CURRENT_REPORT_POLICY = ReportPolicy(deadband=10, relative=0.02, heartbeat=300)  # 10 mA
+POWER_REPORT_POLICY = ReportPolicy(deadband=10, relative=0.02, heartbeat=300)  # 1 W
+
 
 class FaultCode(t.enum8):
     """Fault Code enum."""
@@ -354,20 +367,29 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
             TuyaRCBOOnOff.ep_attribute,
             "child_lock",
         ),
-        TUYA_DP_VOLTAGE: DPToAttributeMapping(
-            TuyaRCBOElectricalMeasurement.ep_attribute,
-            "rms_voltage",
-            lambda x: x[1] | x[0] << 8,
+        TUYA_DP_VOLTAGE: with_report_policy(
+            DPToAttributeMapping(
+                TuyaRCBOElectricalMeasurement.ep_attribute,
+                "rms_voltage",
+                packed_converter(PackedField("rms_voltage", offset=0, width=2)),
+            ),
+            VOLTAGE_REPORT_POLICY,
         ),
-        TUYA_DP_CURRENT: DPToAttributeMapping(
-            TuyaRCBOElectricalMeasurement.ep_attribute,
-            "rms_current",
-            lambda x: x[2] | x[1] << 8,
+        TUYA_DP_CURRENT: with_report_policy(
+            DPToAttributeMapping(
+                TuyaRCBOElectricalMeasurement.ep_attribute,
+                "rms_current",
+                packed_converter(PackedField("rms_current", offset=1, width=2)),
+            ),
+            CURRENT_REPORT_POLICY,
         ),
-        TUYA_DP_ACTIVE_POWER: DPToAttributeMapping(
-            TuyaRCBOElectricalMeasurement.ep_attribute,
-            "active_power",
-            lambda x: x[2] | x[1] << 8,
+        TUYA_DP_ACTIVE_POWER: with_report_policy(
+            DPToAttributeMapping(
+                TuyaRCBOElectricalMeasurement.ep_attribute,
+                "active_power",
+                packed_converter(PackedField("active_power", offset=1, width=2)),
+            ),
+            POWER_REPORT_POLICY,
         ),
         TUYA_DP_LEAKAGE_CURRENT: DPToAttributeMapping(
             TuyaRCBOElectricalMeasurement.ep_attribute,
@@ -385,7 +407,10 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
         TUYA_DP_COST_PARAMETERS: DPToAttributeMapping(
             TuyaRCBOMetering.ep_attribute,
             ("cost_parameters", "cost_parameters_enabled"),
-            lambda x: (x[1] | x[0] << 8, x[2]),
+            packed_converter(
+                PackedField("cost_parameters", offset=0, width=2),
+                PackedField("cost_parameters_enabled", offset=2),
+            ),
             CostParameters,
         ),
         TUYA_DP_LEAKAGE_PARAMETERS: DPToAttributeMapping(
@@ -399,7 +424,15 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
                 "over_leakage_current_alarm",
                 "self_test",
             ),
-            lambda x: (x[0], x[1], x[2], x[4] | x[3] << 8, x[5], x[6], SelfTest(x[7])),
+            packed_converter(
+                PackedField("self_test_auto_days", offset=0),
+                PackedField("self_test_auto_hours", offset=1),
+                PackedField("self_test_auto", offset=2),
+                PackedField("over_leakage_current_threshold", offset=3, width=2),
+                PackedField("over_leakage_current_trip", offset=5),
+                PackedField("over_leakage_current_alarm", offset=6),
+                PackedField("self_test", offset=7, type=SelfTest),
+            ),
             LeakageParameters,
         ),
         TUYA_DP_VOLTAGE_THRESHOLD: DPToAttributeMapping(
@@ -411,12 +444,20 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
                 "rms_extreme_under_voltage",
                 "under_voltage_trip",
             ),
-            lambda x: (
-                x[1] | x[0] << 8,
-                x[2],
-                AttributeWithMask(x[3] << 6 | x[7] << 7, 1 << 6 | 1 << 7),
-                x[5] | x[4] << 8,
-                x[6],
+            packed_converter(
+                PackedField("over_voltage_threshold", offset=0, width=2),
+                PackedField("over_voltage_trip", offset=2),
+                PackedField("over_voltage_alarm", offset=3),
+                PackedField("under_voltage_threshold", offset=4, width=2),
+                PackedField("under_voltage_trip", offset=6),
+                PackedField("under_voltage_alarm", offset=7),
+                result=lambda ov, ov_trip, ov_alarm, uv, uv_trip, uv_alarm: (
+                    ov,
+                    ov_trip,
+                    AttributeWithMask(ov_alarm << 6 | uv_alarm << 7, 1 << 6 | 1 << 7),
+                    uv,
+                    uv_trip,
+                ),
             ),
             lambda rms_extreme_over_voltage, over_voltage_trip, ac_alarms_mask, rms_extreme_under_voltage, under_voltage_trip: (
                 VoltageParameters(
@@ -432,10 +473,15 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
         TUYA_DP_CURRENT_THRESHOLD: DPToAttributeMapping(
             TuyaRCBOElectricalMeasurement.ep_attribute,
             ("ac_current_overload", "over_current_trip", "ac_alarms_mask"),
-            lambda x: (
-                (x[2] | x[1] << 8 | x[0] << 16),
-                x[3],
-                AttributeWithMask(x[4] << 1, 1 << 1),
+            packed_converter(
+                PackedField("over_current_threshold", offset=0, width=3),
+                PackedField("over_current_trip", offset=3),
+                PackedField("over_current_alarm", offset=4),
+                result=lambda threshold, trip, alarm: (
+                    threshold,
+                    trip,
+                    AttributeWithMask(alarm << 1, 1 << 1),
+                ),
             ),
             lambda ac_current_overload, over_current_trip, ac_alarms_mask: (
                 CurrentParameters(
@@ -446,7 +492,12 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
         TUYA_DP_TEMPERATURE_THRESHOLD: DPToAttributeMapping(
             TuyaRCBODeviceTemperature.ep_attribute,
             ("high_temp_thres", "over_temp_trip", "dev_temp_alarm_mask"),
-            lambda x: (x[0] if x[0] <= 127 else x[0] - 256, x[1], x[2] << 1),
+            packed_converter(
+                PackedField("over_temperature_threshold", offset=0, signed=True),
+                PackedField("over_temperature_trip", offset=1),
+                PackedField("over_temperature_alarm", offset=2),
+                result=lambda threshold, trip, alarm: (threshold, trip, alarm << 1),
+            ),
             lambda x, y, z: TemperatureSetting(x, y, bool(z & 0x02)),
         ),
         TUYA_DP_TOTAL_ACTIVE_POWER: DPToAttributeMapping(
@@ -469,12 +520,12 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
         TUYA_DP_HISTORICAL_VOLTAGE: DPToAttributeMapping(
             TuyaRCBOElectricalMeasurement.ep_attribute,
             "rms_historical_voltage",
-            lambda x: x[1] | x[0] << 8,
+            packed_converter(PackedField("rms_historical_voltage", offset=0, width=2)),
         ),
         TUYA_DP_HISTORICAL_CURRENT: DPToAttributeMapping(
             TuyaRCBOElectricalMeasurement.ep_attribute,
             "rms_historical_current",
-            lambda x: x[2] | x[1] << 8,
+            packed_converter(PackedField("rms_historical_current", offset=1, width=2)),
         ),
     }
 
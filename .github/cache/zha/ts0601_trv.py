@@ -221,6 +221,9 @@ class MoesManufCluster(TuyaManufClusterAttributes):
     set_time_offset = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
     set_time_local_offset = datetime.datetime(1970, 1, 1)
 
+    # schedule and setpoint changes are sent as a single set_data frame
+    tuya_multi_dp_writes = True
+
     class AttributeDefs(TuyaManufClusterAttributes.AttributeDefs):
         """Attribute definitions."""
 
@@ -736,136 +739,28 @@ class MoesThermostat(TuyaThermostatCluster):
             prog_mode = self.ProgrammingOperationMode.Simple
             occupancy = self.Occupancy.Occupied
 
-        self._update_attribute(
-            self.attributes_by_name["programing_oper_mode"].id, prog_mode
+        self.update_attributes(
+            {"programing_oper_mode": prog_mode, "occupancy": occupancy}
         )
-        self._update_attribute(self.attributes_by_name["occupancy"].id, occupancy)
 
     def schedule_change(self, attr, value):
         """Scheduler attribute change."""
 
         if attr == MOES_SCHEDULE_WORKDAY_ATTR:
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_hour"].id, value[17] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_minute"].id, value[16]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_temperature"].id,
-                value[15] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_hour"].id, value[14] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_minute"].id, value[13]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_temperature"].id,
-                value[12] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_hour"].id, value[11] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_minute"].id, value[10]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_temperature"].id,
-                value[9] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_hour"].id, value[8] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_minute"].id, value[7]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_temperature"].id,
-                value[6] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_hour"].id, value[5] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_minute"].id, value[4]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_temperature"].id,
-                value[3] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_hour"].id, value[2] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_minute"].id, value[1]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_temperature"].id,
-                value[0] * 100,
-            )
+            day = "workday"
         elif attr == MOES_SCHEDULE_WEEKEND_ATTR:
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_hour"].id, value[17] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_minute"].id, value[16]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_temperature"].id,
-                value[15] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_hour"].id, value[14] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_minute"].id, value[13]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_temperature"].id,
-                value[12] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_hour"].id, value[11] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_minute"].id, value[10]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_temperature"].id,
-                value[9] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_hour"].id, value[8] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_minute"].id, value[7]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_temperature"].id,
-                value[6] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_hour"].id, value[5] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_minute"].id, value[4]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_temperature"].id,
-                value[3] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_hour"].id, value[2] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_minute"].id, value[1]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_temperature"].id,
-                value[0] * 100,
-            )
+            day = "weekend"
+        else:
+            return
+
+        # the six periods are stored last to first, as temperature, minute, hour
+        schedule = {}
+        for period in range(1, 7):
+            offset = 18 - 3 * period
+            schedule[f"{day}_schedule_{period}_hour"] = value[offset + 2] & 0x3F
+            schedule[f"{day}_schedule_{period}_minute"] = value[offset + 1]
+            schedule[f"{day}_schedule_{period}_temperature"] = value[offset] * 100
+        self.update_attributes(schedule)
 
 
 class MoesThermostatNew(MoesThermostat):
@@ -1342,6 +1237,7 @@ class ZONNSMARTThermostat(TuyaThermostatCluster):
     def mode_change(self, attrid, value):
         """Mode change."""
         operation_preset = None
+        attrs = {}
 
         if attrid == ZONNSMART_MODE_ATTR:
             prog_mode = None
@@ -1361,17 +1257,14 @@ class ZONNSMARTThermostat(TuyaThermostatCluster):
                 self.error("Unsupported value for Mode")
 
             if prog_mode is not None:
-                self._update_attribute(
-                    self.attributes_by_name["programing_oper_mode"].id, prog_mode
-                )
+                attrs["programing_oper_mode"] = prog_mode
         elif attrid == ZONNSMART_FROST_PROTECT_ATTR:
             if value == 1:
                 operation_preset = self.Preset.FrostProtect
 
         if operation_preset is not None:
-            self._update_attribute(
-                self.attributes_by_name["operation_preset"].id, operation_preset
-            )
+            attrs["operation_preset"] = operation_preset
+        self.update_attributes(attrs)
 
     def system_mode_change(self, value):
         """System Mode change."""
@@ -4,7 +4,10 @@ Heavily inspired by work from @mak-42
 https://github.com/Koenkk/zigbee-herdsman-converters/blob/9d5e7b902479582581615cbfac3148d66d4c675c/lib/zosung.js
 """
 
+import asyncio
 import base64
+from collections import deque
+import functools
 import logging
 from typing import Any, Final, Union
 
@@ -33,9 +36,19 @@ from zhaquirks.const import (
     PROFILE_ID,
 )
 from zhaquirks.legacy import CustomDevice
+from zhaquirks.tuya import TuyaDefaultResponsePolicy
 
 _LOGGER = logging.getLogger(__name__)
 
+# seconds after which an unfinished IR transfer is dropped
+IR_SESSION_TIMEOUT = 60
+# chunk size of the original stop-and-wait transfer, accepted by all devices
+IR_CHUNK_SIZE = 0x38
+# bytes a full reply adds to the chunk size asked for next
+IR_CHUNK_GROWTH = 8
+# number of encoded IR codes kept for repeated sends
+IR_CODE_CACHE_SIZE = 64
+
 
 class Bytes(bytes):
     """Bytes serializable class."""
@@ -50,6 +63,185 @@ class Bytes(bytes):
         return cls(data), b""
 
 
+class IRPayload:
+    """IR code encoded for sending, with the chunks the device asked for."""
+
+    def __init__(self, code: str) -> None:
+        """Init the payload of an IR code."""
+        self.data = (
+            f'{{"key_num":1,"delay":300,"key1":'
+            f'{{"num":1,"freq":38000,"type":1,"key_code":"{code}"}}}}'
+        ).encode("utf-8")
+        # (position, maxlen) -> (chunk, crc)
+        self._chunks: dict[tuple[int, int], tuple[bytes, int]] = {}
+
+    def chunk(self, position: int, maxlen: int) -> tuple[bytes, int]:
+        """Return the chunk of the payload at `position` and its checksum."""
+        key = (position, maxlen)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            part = self.data[position : position + maxlen]
+            chunk = self._chunks[key] = (part, sum(part) % 0x100)
+        return chunk
+
+
+@functools.lru_cache(maxsize=IR_CODE_CACHE_SIZE)
+def encode_ir_code(code: str) -> IRPayload:
+    """Return the payload of an IR code, shared by repeated sends of the code."""
+    return IRPayload(code)
+
+
+class IRSessions:
+    """IR transfers in progress by sequence number, dropped after a timeout."""
+
+    def __init__(self, timeout: float = IR_SESSION_TIMEOUT) -> None:
+        """Init an empty set of sessions."""
+        self.timeout = timeout
+        self._sessions: dict[int, Any] = {}
+        self._timers: dict[int, asyncio.TimerHandle] = {}
+
+    def __contains__(self, seq: int) -> bool:
+        """Return True if a transfer with the sequence number is in progress."""
+        return seq in self._sessions
+
+    def __len__(self) -> int:
+        """Return the number of transfers in progress."""
+        return len(self._sessions)
+
+    def __getitem__(self, seq: int) -> Any:
+        """Return the transfer with the sequence number."""
+        return self._sessions[seq]
+
+    def get(self, seq: int) -> Any:
+        """Return the transfer with the sequence number, if any."""
+        return self._sessions.get(seq)
+
+    def add(self, seq: int, session: Any) -> None:
+        """Start tracking a transfer, replacing one with the same sequence."""
+        self.pop(seq)
+        self._sessions[seq] = session
+        self._timers[seq] = asyncio.get_running_loop().call_later(
+            self.timeout, self._expire, seq
+        )
+
+    def pop(self, seq: int) -> Any:
+        """Stop tracking a transfer and return it, if any."""
+        timer = self._timers.pop(seq, None)
+        if timer is not None:
+            timer.cancel()
+        return self._sessions.pop(seq, None)
+
+    def _expire(self, seq: int) -> None:
+        self._timers.pop(seq, None)
+        if self._sessions.pop(seq, None) is not None:
+            _LOGGER.debug("IR transfer %s timed out", seq)
+
+
+class IRTransfer:
+    """Reassembly of an IR code the device sends in chunks.
+
+    Several chunks are requested at once, once the first one was received.
+    Each full reply grows the chunk size asked for next, up to
+    `max_chunk_size`; a shorter reply caps it for the rest of the transfer.
+    If replies stop coming, `retry` requests the missing chunks again one at
+    a time.
+    """
+
+    def __init__(
+        self,
+        seq: int,
+        length: int,
+        chunk_size: int,
+        window: int,
+        max_chunk_size: int | None = None,
+    ) -> None:
+        """Init a transfer of `length` bytes."""
+        self.seq = seq
+        self.buffer = bytearray(length)
+        self.received = 0
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max(chunk_size, max_chunk_size or chunk_size)
+        self.window = window
+        self.retries = 0
+        self._negotiated = False
+        self._capped = False
+        self._next_position = 0
+        # position -> requested length of the chunks in flight
+        self._pending: dict[int, int] = {}
+        # (position, length) of ranges a shorter reply left out
+        self._gaps: deque[tuple[int, int]] = deque()
+
+    @property
+    def complete(self) -> bool:
+        """Return True once all bytes were received."""
+        return self.received >= len(self.buffer)
+
+    def next_requests(self) -> list[tuple[int, int]]:
+        """Return the (position, maxlen) chunks to request to fill the window."""
+        window = self.window if self._negotiated else 1
+        requests = []
+        while len(self._pending) < window:
+            if self._gaps:
+                position, length = self._gaps.popleft()
+                if length > self.chunk_size:
+                    self._gaps.appendleft(
+                        (position + self.chunk_size, length - self.chunk_size)
+                    )
+                    length = self.chunk_size
+            elif self._next_position < len(self.buffer):
+                position = self._next_position
+                length = min(self.chunk_size, len(self.buffer) - position)
+                self._next_position += length
+            else:
+                break
+            self._pending[position] = length
+            requests.append((position, length))
+        return requests
+
+    def receive(self, position: int, part: bytes) -> bool:
+        """Store a chunk, return False if it wasn't requested."""
+        requested = self._pending.pop(position, None)
+        if requested is None:
+            return False
+
+        size = min(len(part), requested)
+        self.buffer[position : position + size] = part[:size]
+        self.received += size
+        if size < requested:
+            if size:
+                self.chunk_size = min(self.chunk_size, size)
+                self._capped = True
+            if position + requested == self._next_position:
+                self._next_position = position + size
+            else:
+                self._gaps.append((position + size, requested - size))
+        elif requested == self.chunk_size and not self._capped:
+            self.chunk_size = min(
+                self.chunk_size + IR_CHUNK_GROWTH, self.max_chunk_size
+            )
+        self._negotiated = True
+        return True
+
+    @property
+    def waiting(self) -> bool:
+        """Return True while chunks requested are not received yet."""
+        return bool(self._pending)
+
+    def retry(self) -> None:
+        """Request the chunks in flight again, one at a time and at most 0x38 long.
+
+        Used when the device stopped replying, e.g. because it drops requests
+        for larger chunks or more than one request at a time.
+        """
+        for position, length in sorted(self._pending.items(), reverse=True):
+            self._gaps.appendleft((position, length))
+        self._pending.clear()
+        self.chunk_size = min(self.chunk_size, IR_CHUNK_SIZE)
+        self.window = 1
+        self._capped = True
+        self.retries += 1
+
+
 class ZosungIRControl(CustomCluster):
     """Zosung IR Control Cluster (0xE004)."""
 
@@ -120,20 +312,17 @@ class ZosungIRControl(CustomCluster):
                 tsn=tsn,
             )
         elif command_id == self.ServerCommandDefs.IRSend.id:
-            ir_msg = (
-                f'{{"key_num":1,"delay":300,"key1":'
-                f'{{"num":1,"freq":38000,"type":1,"key_code":"{kwargs["code"]}"}}}}'
-            )
+            ir_msg = encode_ir_code(kwargs["code"])
             _LOGGER.debug(
-                "Sending IR code: %s to %s", ir_msg, self.endpoint.device.ieee
+                "Sending IR code: %s to %s", ir_msg.data, self.endpoint.device.ieee
             )
             seq = self.endpoint.device.next_seq()
-            self.endpoint.device.ir_msg_to_send = {seq: ir_msg}
+            self.endpoint.device.ir_msg_to_send.add(seq, ir_msg)
             self.create_catching_task(
                 self.endpoint.zosung_irtransmit.command(
                     0x00,
                     seq=seq,
-                    length=len(ir_msg),
+                    length=len(ir_msg.data),
                     unk1=0x00000000,
                     clusterid=0xE004,
                     unk2=0x01,
@@ -160,9 +349,17 @@ class ZosungIRTransmit(CustomCluster):
     cluster_id = 0xED00
     ep_attribute = "zosung_irtransmit"
 
-    current_position = 0
-    msg_length = 0
-    ir_msg = []
+    # chunk size asked for first when learning, grown on each full reply up to
+    # the largest 0x03 reply fitting a single unfragmented APS frame. Devices
+    # replying with less cap it. 0x38 and a window of 1 is the original
+    # stop-and-wait transfer.
+    ir_chunk_size: int = IR_CHUNK_SIZE
+    ir_max_chunk_size: int = 0x46
+    # chunk requests kept in flight when learning
+    ir_window: int = 4
+    # seconds without a reply after which the chunks in flight are requested
+    # again, one at a time and at most 0x38 long
+    ir_chunk_timeout: float = 2.0
 
     class ServerCommandDefs(BaseCommandDefs):
         """Server command definitions."""
@@ -253,6 +450,54 @@ class ZosungIRTransmit(CustomCluster):
             manufacturer_code=None,
         )
 
+    def __init__(self, *args, **kwargs):
+        """Init cluster."""
+        super().__init__(*args, **kwargs)
+        # IR codes being learned, by sequence number
+        self._ir_transfers = IRSessions()
+        # timers requesting chunks again when the device stops replying
+        self._ir_chunk_timers: dict[int, asyncio.TimerHandle] = {}
+
+    def _request_ir_chunks(
+        self, transfer: IRTransfer, expect_reply: bool = False
+    ) -> None:
+        """Request the next chunks of an IR code being learned."""
+        for position, maxlen in transfer.next_requests():
+            self.create_catching_task(
+                super().command(
+                    0x02,
+                    seq=transfer.seq,
+                    position=position,
+                    maxlen=maxlen,
+                    expect_reply=expect_reply,
+                )
+            )
+
+        self._stop_ir_chunk_timer(transfer.seq)
+        if transfer.waiting:
+            self._ir_chunk_timers[transfer.seq] = asyncio.get_running_loop().call_later(
+                self.ir_chunk_timeout, self._ir_chunk_timed_out, transfer
+            )
+
+    def _stop_ir_chunk_timer(self, seq: int) -> None:
+        timer = self._ir_chunk_timers.pop(seq, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _ir_chunk_timed_out(self, transfer: IRTransfer) -> None:
+        """Request the chunks in flight again, if the transfer is still going on."""
+        self._ir_chunk_timers.pop(transfer.seq, None)
+        if self._ir_transfers.get(transfer.seq) is not transfer:
+            return
+
+        _LOGGER.debug(
+            "No IR frame 0x03 from %s, requesting chunks again (seq:%s)",
+            self.endpoint.device.ieee,
+            transfer.seq,
+        )
+        transfer.retry()
+        self._request_ir_chunks(transfer)
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -263,16 +508,20 @@ class ZosungIRTransmit(CustomCluster):
         """Handle a cluster request."""
 
         # send default response to avoid repeated zcl frame from device
-        if not hdr.frame_control.disable_default_response:
-            _LOGGER.debug("Sending default response to %s", self.endpoint.device.ieee)
-            self.send_default_rsp(hdr, status=foundation.Status.SUCCESS)
+        answered = TuyaDefaultResponsePolicy.acknowledge(self, hdr)
+        status = foundation.Status.SUCCESS
 
         if hdr.command_id == self.ServerCommandDefs.receive_ir_frame_00.id:
             _LOGGER.debug("Received IR frame 0x00 from %s", self.endpoint.device.ieee)
 
-            self.current_position = 0
-            self.ir_msg.clear()
-            self.msg_length = args.length
+            transfer = IRTransfer(
+                args.seq,
+                args.length,
+                self.ir_chunk_size,
+                self.ir_window,
+                self.ir_max_chunk_size,
+            )
+            self._ir_transfers.add(args.seq, transfer)
 
             cmd_01_args = {
                 "zero": 0,
@@ -287,30 +536,36 @@ class ZosungIRTransmit(CustomCluster):
             self.create_catching_task(
                 super().command(0x01, **cmd_01_args, expect_reply=True)
             )
-            cmd_02_args = {"seq": args.seq, "position": 0, "maxlen": 0x38}
-            self.create_catching_task(
-                super().command(0x02, **cmd_02_args, expect_reply=True)
-            )
+            self._request_ir_chunks(transfer, expect_reply=True)
         elif hdr.command_id == self.ServerCommandDefs.receive_ir_frame_01.id:
             _LOGGER.debug(
                 "IR-Message-Code01 received, sequence: %s, from %s",
                 args.seq,
                 self.endpoint.device.ieee,
             )
+            ir_msg = self.endpoint.device.ir_msg_to_send.get(args.seq)
             _LOGGER.debug(
                 "Message to send: %s, to %s",
-                self.endpoint.device.ir_msg_to_send[args.seq],
+                ir_msg.data if ir_msg is not None else None,
                 self.endpoint.device.ieee,
             )
+            if ir_msg is None:
+                status = foundation.Status.NOT_FOUND
         elif hdr.command_id == self.ServerCommandDefs.receive_ir_frame_02.id:
             position = args.position
             seq = args.seq
             maxlen = args.maxlen
-            irmsg = self.endpoint.device.ir_msg_to_send[seq]
-            msgpart = irmsg[position : position + maxlen]
-            calculated_crc = 0
-            for x in msgpart:
-                calculated_crc = (calculated_crc + ord(x)) % 0x100
+            ir_msg = self.endpoint.device.ir_msg_to_send.get(seq)
+            if ir_msg is None:
+                _LOGGER.debug(
+                    "No IR code to send to %s (seq:%s)", self.endpoint.device.ieee, seq
+                )
+                if not answered:
+                    TuyaDefaultResponsePolicy.respond(
+                        self, hdr, foundation.Status.NOT_FOUND
+                    )
+                return
+            msgpart, calculated_crc = ir_msg.chunk(position, maxlen)
             _LOGGER.debug(
                 "Received IR frame 0x02 from %s, msgsrc: %s, position: %s, msgpart: %s",
                 self.endpoint.device.ieee,
@@ -322,7 +577,7 @@ class ZosungIRTransmit(CustomCluster):
                 "zero": 0,
                 "seq": seq,
                 "position": position,
-                "msgpart": msgpart.encode("utf-8"),
+                "msgpart": msgpart,
                 "msgpartcrc": calculated_crc,
             }
             self.create_catching_task(
@@ -330,9 +585,7 @@ class ZosungIRTransmit(CustomCluster):
             )
         elif hdr.command_id == self.ServerCommandDefs.receive_ir_frame_03.id:
             msg_part_crc = args.msgpartcrc
-            calculated_crc = 0
-            for x in args.msgpart:
-                calculated_crc = (calculated_crc + x) % 0x100
+            calculated_crc = sum(args.msgpart) % 0x100
             _LOGGER.debug(
                 "Received IR frame 0x03 from %s, msgcrc: %s, "
                 "calculated_crc: %s, position: %s",
@@ -341,20 +594,28 @@ class ZosungIRTransmit(CustomCluster):
                 calculated_crc,
                 args.position,
             )
-            self.ir_msg[args.position :] = args.msgpart
-            if args.position + len(args.msgpart) < self.msg_length:
-                cmd_02_args = {
-                    "seq": args.seq,
-                    "position": args.position + len(args.msgpart),
-                    "maxlen": 0x38,
-                }
-                self.create_catching_task(
-                    super().command(0x02, **cmd_02_args, expect_reply=False)
+            transfer = self._ir_transfers.get(args.seq)
+            if transfer is None:
+                _LOGGER.debug(
+                    "No IR code being learned from %s (seq:%s)",
+                    self.endpoint.device.ieee,
+                    args.seq,
+                )
+                status = foundation.Status.NOT_FOUND
+            elif not transfer.receive(args.position, args.msgpart):
+                # a chunk already received, e.g. late after a retry
+                _LOGGER.debug(
+                    "Ignoring unexpected IR frame 0x03 from %s, position: %s",
+                    self.endpoint.device.ieee,
+                    args.position,
                 )
+            elif not transfer.complete:
+                self._request_ir_chunks(transfer)
             else:
                 _LOGGER.debug(
                     "IR message completely received from %s", self.endpoint.device.ieee
                 )
+                self._stop_ir_chunk_timer(args.seq)
                 cmd_04_args = {"zero0": 0, "seq": args.seq, "zero1": 0}
                 self.create_catching_task(
                     super().command(0x04, **cmd_04_args, expect_reply=False)
@@ -364,14 +625,20 @@ class ZosungIRTransmit(CustomCluster):
             _LOGGER.debug(
                 "IR code has been sent to %s (seq:%s)", self.endpoint.device.ieee, seq
             )
+            if self.endpoint.device.ir_msg_to_send.pop(seq) is None:
+                status = foundation.Status.NOT_FOUND
             cmd_05_args = {"seq": seq, "zero": 0}
             self.create_catching_task(
                 super().command(0x05, **cmd_05_args, expect_reply=False)
             )
         elif hdr.command_id == self.ServerCommandDefs.receive_ir_frame_05.id:
-            self.endpoint.device.last_learned_ir_code = base64.b64encode(
-                bytes(self.ir_msg)
-            ).decode()
+            transfer = self._ir_transfers.pop(args.seq)
+            if transfer is not None:
+                self.endpoint.device.last_learned_ir_code = base64.b64encode(
+                    transfer.buffer
+                ).decode()
+            else:
+                status = foundation.Status.NOT_FOUND
             _LOGGER.info(
                 "IR message really totally received: %s, from %s",
                 self.endpoint.device.last_learned_ir_code,
@@ -391,18 +658,23 @@ class ZosungIRTransmit(CustomCluster):
                 hdr.command_id,
                 self.endpoint.device.ieee,
             )
+            status = foundation.Status.UNSUP_CLUSTER_COMMAND
+
+        if not answered:
+            TuyaDefaultResponsePolicy.respond(self, hdr, status)
 
 
 class ZosungIRBlaster(CustomDevice):
     """Zosung IR Blaster."""
 
     seq = -1
-    ir_msg_to_send = {}
     last_learned_ir_code = t.CharacterString("")
 
     def __init__(self, *args, **kwargs):
         """Init device."""
         self.seq = 0
+        # IR codes being sent, by sequence number
+        self.ir_msg_to_send = IRSessions()
         super().__init__(*args, **kwargs)
 
     def next_seq(self):
@@ -1,6 +1,5 @@
 """BlitzWolf IS-3/Tuya motion rechargeable occupancy sensor."""
 
-import asyncio
 from typing import Any
 
 import zigpy.types as t
@@ -18,10 +17,19 @@ from zhaquirks.builder import (
     UnitOfLength,
     UnitOfTime,
 )
-from zhaquirks.tuya import TuyaLocalCluster, TuyaPowerConfigurationCluster2AAA
+from zhaquirks.tuya import (
+    TimerWheel,
+    TimerWheelResetMixin,
+    TuyaLocalCluster,
+    TuyaPowerConfigurationCluster2AAA,
+)
 from zhaquirks.tuya.builder import TuyaQuirkBuilder
 
 
+class MotionWithTimerWheelReset(TimerWheelResetMixin, MotionWithReset):
+    """Self reset motion cluster, reset by the shared timer wheel."""
+
+
 class TuyaOccupancySensing(OccupancySensing, TuyaLocalCluster):
     """Tuya local OccupancySensing cluster."""
 
@@ -37,7 +45,7 @@ class TuyaMotionWithReset(IasZone, TuyaLocalCluster):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self._loop = asyncio.get_running_loop()
+        self._timer_wheel = TimerWheel.get()
         self._timer_handle = None
 
     def _turn_off(self) -> None:
@@ -55,7 +63,9 @@ class TuyaMotionWithReset(IasZone, TuyaLocalCluster):
             self.debug("%s - Received Tuya motion event", self.endpoint.device.ieee)
             if self._timer_handle:
                 self._timer_handle.cancel()
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self._timer_handle = self._timer_wheel.call_later(
+                self.reset_s, self._turn_off
+            )
 
         super()._update_attribute(attrid, value)
 
@@ -1629,7 +1639,7 @@ base_tuya_motion = (
 (
     TuyaQuirkBuilder("_TZ3000_bb6xaihh", "SNZB-03")
     .applies_to("_TZ3040_bb6xaihh", "TS0202")
-    .replaces(MotionWithReset)
+    .replaces(MotionWithTimerWheelReset)
     .replaces(TuyaPowerConfigurationCluster2AAA)
     .tuya_enchantment()
     .skip_configuration()
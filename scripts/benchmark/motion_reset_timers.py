@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Scheduler overhead of motion sensor auto-reset timers.
+
+Compares one ``loop.call_later`` per sensor, cancelled and re-armed on every
+motion event, against the shared ``TimerWheel`` of ``zhaquirks.tuya``:
+
+- ``re-arm``: cost of a motion event re-arming an armed reset timer
+- ``heap``: timer handles in the event loop heap with every sensor armed
+- ``expire``: CPU time and timer callbacks run by the loop to reset all sensors
+
+Requires ``zhaquirks`` (with ``.github/cache/zha`` as ``zhaquirks.tuya``) to be
+importable::
+
+    python scripts/benchmark/motion_reset_timers.py --sensors 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+from zhaquirks.tuya import TimerWheel
+
+
+class Sensor:
+    """Motion sensor resetting its state `reset_s` after the last event."""
+
+    def __init__(self, scheduler, reset_s: float) -> None:
+        """Init sensor."""
+        self.scheduler = scheduler
+        self.reset_s = reset_s
+        self.resets = 0
+        self._timer_handle = None
+
+    def _turn_off(self) -> None:
+        self._timer_handle = None
+        self.resets += 1
+
+    def motion_event(self) -> None:
+        """Re-arm the reset, as the motion clusters do."""
+        if self._timer_handle:
+            self._timer_handle.cancel()
+        self._timer_handle = self.scheduler.call_later(self.reset_s, self._turn_off)
+
+
+async def measure(name: str, scheduler, sensors: int, events: int, tick: float):
+    """Measure one scheduler."""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(0)
+    population = [
+        Sensor(scheduler, 10 * tick * rng.uniform(1, 3)) for _ in range(sensors)
+    ]
+    order = [rng.randrange(sensors) for _ in range(events)]
+
+    for sensor in population:
+        sensor.motion_event()
+    start = time.perf_counter()
+    for index in order:
+        population[index].motion_event()
+    rearm = (time.perf_counter() - start) / events
+    heap = len(loop._scheduled)  # noqa: SLF001
+
+    cpu = time.process_time()
+    await asyncio.sleep(max(sensor.reset_s for sensor in population) + 2 * tick)
+    cpu = time.process_time() - cpu
+    assert all(sensor.resets == 1 for sensor in population)
+    # timer callbacks run by the loop: one per sensor, or one per wheel tick
+    callbacks = scheduler._ticks if isinstance(scheduler, TimerWheel) else sensors
+
+    print(
+        f"  {name:<10} re-arm {rearm * 1e6:6.2f} us  heap {heap:7d}  "
+        f"expire {cpu * 1e3:7.1f} ms CPU, {callbacks:7d} loop callbacks"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the benchmark for every sensor count."""
+    loop = asyncio.get_running_loop()
+    for sensors in args.sensors:
+        print(f"{sensors} sensors, {args.events_per_sensor} events per sensor")
+        events = sensors * args.events_per_sensor
+        await measure("call_later", loop, sensors, events, args.tick)
+        wheel = TimerWheel(loop, tick=args.tick)
+        await measure("wheel", wheel, sensors, events, args.tick)
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--events-per-sensor", type=int, default=10)
+    parser.add_argument(
+        "--tick",
+        type=float,
+        default=0.01,
+        help="wheel tick in seconds, resets are scaled to 10-30 ticks",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Cold-start import time and RSS of eager against lazy quirk loading.
+
+Each scenario runs in a fresh interpreter, after zigpy, ``zhaquirks`` and
+``zhaquirks.tuya`` are imported:
+
+- ``eager`` imports every vendored quirk module in ``.github/cache/zha``, as
+  ``zhaquirks.setup()`` does.
+- ``lazy`` reads ``quirk_manifest.json`` and only imports the modules for the
+  devices of an installation, by default the first ``--devices`` (manufacturer,
+  model) pairs of ``data/fingerprints.json`` with a quirk.
+
+Requires ``zigpy`` and ``zhaquirks`` (with ``.github/cache/zha`` as
+``zhaquirks.tuya``) to be importable::
+
+    python scripts/benchmark/quirk_lazy_import.py --devices 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import pathlib
+import resource
+import subprocess
+import sys
+import time
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+QUIRKS_DIR = ROOT / ".github" / "cache" / "zha"
+FINGERPRINTS = ROOT / "data" / "fingerprints.json"
+PACKAGE = "vendored_quirks"
+
+
+def rss_kib() -> int:
+    """Return the current resident set size in KiB."""
+    with open("/proc/self/statm", encoding="ascii") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * resource.getpagesize() // 1024
+
+
+def installation(count: int) -> list[tuple[str, str]]:
+    """Return the first `count` fingerprint pairs that have a quirk module."""
+    manifest = json.loads((QUIRKS_DIR / "quirk_manifest.json").read_text())
+    fingerprints = json.loads(FINGERPRINTS.read_text())
+    pairs = []
+    for manufacturer, info in fingerprints.items():
+        for model in info.get("modelIds", []):
+            by_manufacturer = manifest["models"].get(model, {})
+            if manufacturer in by_manufacturer:
+                pairs.append((manufacturer, model))
+    return pairs[:count]
+
+
+def child(scenario: str, devices: int) -> None:
+    """Measure one scenario and print the result as JSON."""
+    import zhaquirks  # noqa: F401
+    import zhaquirks.tuya  # noqa: F401
+
+    # the vendored modules, without running their ``__init__`` again
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(QUIRKS_DIR)]
+    sys.modules[PACKAGE] = package
+
+    pairs = installation(devices)
+    baseline = rss_kib()
+    start = time.perf_counter()
+
+    if scenario == "eager":
+        modules = []
+        for path in sorted(QUIRKS_DIR.glob("*.py")):
+            if path.stem in ("__init__", "quirk_index", "quirk_manifest"):
+                continue
+            try:
+                modules.append(importlib.import_module(f"{PACKAGE}.{path.stem}"))
+            except Exception:  # noqa: BLE001
+                continue
+        loaded = len(modules)
+    else:
+        from zhaquirks.tuya.quirk_manifest import LazyQuirkLoader
+
+        loader = LazyQuirkLoader.from_file(QUIRKS_DIR / "quirk_manifest.json", PACKAGE)
+        loader.load_eager()
+        for manufacturer, model in pairs:
+            try:
+                loader.load_for(manufacturer, model)
+            except Exception:  # noqa: BLE001
+                continue
+        loaded = len(loader.loaded)
+
+    elapsed = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "modules": loaded,
+                "devices": len(pairs),
+                "seconds": elapsed,
+                "rss_kib": rss_kib() - baseline,
+            }
+        )
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", choices=("eager", "lazy"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.devices)
+        return
+
+    results = {}
+    for scenario in ("eager", "lazy"):
+        runs = [
+            json.loads(
+                subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--child",
+                        scenario,
+                        "--devices",
+                        str(args.devices),
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+            )
+            for _ in range(args.repeat)
+        ]
+        results[scenario] = best = min(runs, key=lambda run: run["seconds"])
+        print(
+            f"{scenario:<6} {best['modules']:4d} modules "
+            f"({best['devices']} devices) "
+            f"{best['seconds'] * 1e3:8.1f} ms "
+            f"{best['rss_kib'] / 1024:7.1f} MiB RSS"
+        )
+
+    eager, lazy = results["eager"], results["lazy"]
+    print(
+        f"lazy loading: {eager['seconds'] / lazy['seconds']:.1f}x faster, "
+        f"{(eager['rss_kib'] - lazy['rss_kib']) / 1024:.1f} MiB less RSS"
+    )
+
+
+if __name__ == "__main__":
+    main()
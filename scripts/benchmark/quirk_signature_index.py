@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Benchmark quirk matching with the signature index against a linear scan.
+
+Loads the vendored v1 quirks from ``.github/cache/zha``, builds in-memory
+devices for the (manufacturer, model) pairs listed in
+``data/fingerprints.json`` and for every ``MODELS_INFO`` entry of the vendored
+quirks, then times ``QuirkSignatureIndex.get_quirk`` against scanning all
+quirks with ``signature_matches``.
+
+Requires ``zigpy`` and ``zhaquirks`` (with ``.github/cache/zha`` as
+``zhaquirks.tuya``) to be importable::
+
+    python scripts/benchmark/quirk_signature_index.py --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import pathlib
+import sys
+import time
+from unittest import mock
+
+from zigpy.profiles import zha
+import zigpy.device
+import zigpy.types as t
+
+from zhaquirks.const import (
+    DEVICE_TYPE,
+    ENDPOINTS,
+    INPUT_CLUSTERS,
+    MANUFACTURER,
+    MODEL,
+    MODELS_INFO,
+    OUTPUT_CLUSTERS,
+    PROFILE_ID,
+)
+from zhaquirks.legacy import signature_matches
+from zhaquirks.tuya.quirk_index import QuirkSignatureIndex
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+QUIRKS_DIR = ROOT / ".github" / "cache" / "zha"
+FINGERPRINTS = ROOT / "data" / "fingerprints.json"
+
+# endpoint layout of a typical TS0601 MCU device, used when no quirk is known
+GENERIC_TS0601 = {
+    1: {
+        PROFILE_ID: zha.PROFILE_ID,
+        DEVICE_TYPE: zha.DeviceType.SMART_PLUG,
+        INPUT_CLUSTERS: [0x0000, 0x0004, 0x0005, 0xEF00],
+        OUTPUT_CLUSTERS: [0x000A, 0x0019],
+    }
+}
+
+
+def load_vendored_modules() -> list:
+    """Import every vendored quirk module that can be imported here."""
+    modules = []
+    for path in sorted(QUIRKS_DIR.glob("*.py")):
+        if path.stem in ("__init__", "quirk_index"):
+            continue
+        name = f"vendored_quirks.{path.stem}"
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception as exc:  # noqa: BLE001
+            print(f"skipping {path.name}: {exc!r}", file=sys.stderr)
+            del sys.modules[name]
+            continue
+        modules.append(module)
+    return modules
+
+
+def make_device(app, manufacturer: str, model: str, endpoints: dict):
+    """Build an in-memory device with the given endpoint layout."""
+    device = zigpy.device.Device(app, t.EUI64.convert("00:11:22:33:44:55:66:77"), 1)
+    device.manufacturer = manufacturer
+    device.model = model
+    for endpoint_id, endpoint_sig in endpoints.items():
+        endpoint = device.add_endpoint(endpoint_id)
+        endpoint.profile_id = endpoint_sig.get(PROFILE_ID, zha.PROFILE_ID)
+        endpoint.device_type = endpoint_sig.get(DEVICE_TYPE, 0)
+        for cluster_id in endpoint_sig.get(INPUT_CLUSTERS, []):
+            endpoint.add_input_cluster(cluster_id)
+        for cluster_id in endpoint_sig.get(OUTPUT_CLUSTERS, []):
+            endpoint.add_output_cluster(cluster_id)
+    return device
+
+
+def models_info(quirk) -> list[tuple[str | None, str | None]]:
+    """Return the (manufacturer, model) pairs of a quirk signature."""
+    signature = quirk.signature
+    return signature.get(MODELS_INFO) or [
+        (signature.get(MANUFACTURER), signature.get(MODEL))
+    ]
+
+
+def linear_match(quirks: list, device):
+    """Scan all quirks, as a matcher without any index would."""
+    for quirk in quirks:
+        if not any(
+            manufacturer in (None, device.manufacturer)
+            and model in (None, device.model)
+            for manufacturer, model in models_info(quirk)
+        ):
+            continue
+        if signature_matches(quirk.signature)(device):
+            return quirk
+    return None
+
+
+def timed(func, devices: list, repeat: int) -> tuple[float, list]:
+    """Return the best time per device of `func` and its results."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(device) for device in devices]
+        best = min(best, time.perf_counter() - start)
+    return best / len(devices), results
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    modules = load_vendored_modules()
+
+    start = time.perf_counter()
+    index = QuirkSignatureIndex.from_modules(modules)
+    build_time = time.perf_counter() - start
+    # like the registry, quirks loaded later take precedence
+    quirks = list(reversed(index._matchers))
+    print(f"indexed {len(index)} quirks in {build_time * 1e3:.1f} ms")
+
+    # endpoint layout for each known (manufacturer, model)
+    layouts = {}
+    for quirk in quirks:
+        for manufacturer, model in models_info(quirk):
+            layouts.setdefault((manufacturer, model), quirk.signature[ENDPOINTS])
+
+    fingerprints = json.loads(FINGERPRINTS.read_text())
+    replays = {
+        "data/fingerprints.json": [
+            (manufacturer, model)
+            for manufacturer, info in fingerprints.items()
+            for model in info.get("modelIds", [])
+        ],
+        "vendored MODELS_INFO": list(layouts),
+    }
+
+    app = mock.MagicMock()
+    for name, pairs in replays.items():
+        devices = [
+            make_device(app, manuf, model, layouts.get((manuf, model), GENERIC_TS0601))
+            for manuf, model in pairs
+        ]
+        linear_time, linear_results = timed(
+            lambda device: linear_match(quirks, device), devices, args.repeat
+        )
+        index_time, index_results = timed(index.get_quirk, devices, args.repeat)
+        assert index_results == linear_results
+
+        matched = sum(result is not None for result in index_results)
+        print(f"{name}: {len(devices)} devices, {matched} matched")
+        print(f"  linear {linear_time * 1e6:10.2f} us/device")
+        print(f"  index  {index_time * 1e6:10.2f} us/device")
+        print(f"  speedup {linear_time / index_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of TuyaCommand frame decoding.
+
+Compares the single pass decoder of ``TuyaCommand.deserialize`` against the
+generic zigpy ``Struct`` decoding it replaced, for typical 0xEF00 reports.
+
+Requires ``zigpy`` and ``zhaquirks`` (with ``.github/cache/zha`` as
+``zhaquirks.tuya``) to be importable::
+
+    python scripts/benchmark/tuya_command_decode.py --number 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import zigpy.types as t
+
+from zhaquirks.tuya import TuyaCommand, TuyaDatapointData
+
+
+def _dp(dp: int, dp_type: int, raw: bytes) -> bytes:
+    return bytes([dp, dp_type, 0, len(raw)]) + raw
+
+
+FRAMES = {
+    # single VALUE report, e.g. a temperature sensor
+    "1 dp": b"\x00\x01" + _dp(1, 0x02, b"\x00\x00\x00\xeb"),
+    # power meter report: voltage, current, power, energy, switch state
+    "5 dp": b"\x00\x02"
+    + _dp(20, 0x02, b"\x00\x00\x08\xfc")
+    + _dp(18, 0x02, b"\x00\x00\x01\x2c")
+    + _dp(19, 0x02, b"\x00\x00\x02\x9e")
+    + _dp(17, 0x02, b"\x00\x01\x86\xa0")
+    + _dp(1, 0x01, b"\x01"),
+    # presence radar burst including RAW and ENUM datapoints
+    "12 dp": b"\x00\x03"
+    + b"".join(_dp(100 + i, 0x02, i.to_bytes(4, "big")) for i in range(8))
+    + _dp(1, 0x04, b"\x01")
+    + _dp(2, 0x00, b"\x00\x12\x01\x02\x05\x06")
+    + _dp(3, 0x05, b"\x00\x01")
+    + _dp(4, 0x01, b"\x00"),
+}
+
+
+def struct_deserialize(data: bytes) -> tuple[TuyaCommand, bytes]:
+    """Decode through the generic zigpy Struct machinery."""
+    return t.Struct.deserialize.__func__(TuyaCommand, data)
+
+
+def read_payloads(command: TuyaCommand) -> list:
+    """Read every payload, as a quirk handling all datapoints would."""
+    return [record.data.payload for record in command.datapoints]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, frame in FRAMES.items():
+        fast, _ = TuyaCommand.deserialize(frame)
+        slow, _ = struct_deserialize(frame)
+        assert all(isinstance(r, TuyaDatapointData) for r in fast.datapoints)
+        assert fast.serialize() == slow.serialize() == frame
+        assert read_payloads(fast) == read_payloads(slow)
+
+        cases = {
+            "struct": lambda frame=frame: struct_deserialize(frame),
+            "fast": lambda frame=frame: TuyaCommand.deserialize(frame),
+            "struct+payload": lambda frame=frame: read_payloads(
+                struct_deserialize(frame)[0]
+            ),
+            "fast+payload": lambda frame=frame: read_payloads(
+                TuyaCommand.deserialize(frame)[0]
+            ),
+        }
+        timings = {
+            case: min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+            / args.number
+            for case, func in cases.items()
+        }
+
+        print(f"{name} ({len(frame)} bytes)")
+        for case, seconds in timings.items():
+            print(f"  {case:<16} {seconds * 1e6:8.2f} us/frame")
+        print(
+            f"  speedup {timings['struct'] / timings['fast']:.1f}x decode, "
+            f"{timings['struct+payload'] / timings['fast+payload']:.1f}x with payload"
+        )
+
+
+if __name__ == "__main__":
+    main()
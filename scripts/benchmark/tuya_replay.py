@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""Replay benchmark of the quirk hot paths.
+
+Builds in-memory zigpy devices for representative quirks of
+``.github/cache/zha`` on a mock application controller, feeds them ZCL frames
+through ``Cluster.deserialize`` and ``Cluster.handle_message`` and reports
+frames/sec, per-frame latency percentiles and memory allocated per frame:
+
+- ``power``: multi-DP ``set_data_response`` reports of a ``ts0601_power``
+  3 phase meter
+- ``rcbo``: ``TuyaRCBOManufCluster`` bursts of single-DP reports
+- ``ir``: ``ts1201`` IR learning streams, start/chunk/end frames
+- ``opple``: ``opple_remote`` multistate input press reports
+
+Frames are synthetic unless ``--recorded`` points to a JSON file mapping
+scenario names to ``[endpoint_id, cluster_id, "<hex ZCL frame>"]`` lists,
+e.g. captured from ZHA debug logs. Nothing is sent over the air: outgoing
+requests such as default responses complete immediately.
+
+Requires ``zigpy`` and ``zhaquirks`` (with ``.github/cache/zha`` as
+``zhaquirks.tuya``) to be importable::
+
+    python scripts/benchmark/tuya_replay.py --frames 5000
+    python scripts/benchmark/tuya_replay.py --scenario power --scenario rcbo
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import dataclasses
+import gc
+import importlib
+import json
+import pathlib
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+from unittest import mock
+
+from zha.quirks import DEVICE_REGISTRY as ZHA_DEVICE_REGISTRY
+from zigpy.profiles import zha
+import zigpy.device
+import zigpy.types as t
+from zigpy.zcl import foundation
+
+from zhaquirks.const import (
+    DEVICE_TYPE,
+    ENDPOINTS,
+    INPUT_CLUSTERS,
+    OUTPUT_CLUSTERS,
+    PROFILE_ID,
+)
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+QUIRKS_DIR = ROOT / ".github" / "cache" / "zha"
+PACKAGE = "vendored_quirks"
+
+# endpoint layout of a typical TS0601 MCU device, for quirks v2
+GENERIC_TS0601 = {
+    1: {
+        PROFILE_ID: zha.PROFILE_ID,
+        DEVICE_TYPE: zha.DeviceType.SMART_PLUG,
+        INPUT_CLUSTERS: [0x0000, 0x0004, 0x0005, 0xEF00],
+        OUTPUT_CLUSTERS: [0x000A, 0x0019],
+    }
+}
+
+# (endpoint_id, cluster_id, ZCL frame)
+Frame = tuple[int, int, bytes]
+
+
+def zcl_frame(
+    tsn: int,
+    command_id: int,
+    payload: bytes,
+    *,
+    general: bool = False,
+    direction: foundation.Direction = foundation.Direction.Server_to_Client,
+) -> bytes:
+    """Return a ZCL frame as sent by a device."""
+    make_header = (
+        foundation.ZCLHeader.general if general else foundation.ZCLHeader.cluster
+    )
+    return make_header(tsn, command_id, direction=direction).serialize() + payload
+
+
+def tuya_frame(tsn: int, datapoints: list[tuple[int, int, bytes]]) -> bytes:
+    """Return a Tuya ``set_data_response`` frame of (dp, type, raw) datapoints."""
+    payload = bytes([0, tsn]) + b"".join(
+        bytes([dp, dp_type, 0, len(raw)]) + raw for dp, dp_type, raw in datapoints
+    )
+    return zcl_frame(tsn, 0x02, payload)
+
+
+def _value(value: int) -> tuple[int, bytes]:
+    return 0x02, value.to_bytes(4, "big", signed=True)
+
+
+def power_frames(count: int) -> list[Frame]:
+    """Reports of a 3 phase power meter, all its DPs in every frame."""
+    frames = []
+    for i in range(count):
+        tsn = i % 256
+        phases = [
+            (
+                dp,
+                0x00,
+                (2300 + i % 7).to_bytes(2, "big")
+                + (1200 + i % 11).to_bytes(3, "big")
+                + (250 + i % 13).to_bytes(3, "big"),
+            )
+            for dp in (6, 7, 8)
+        ]
+        values = [
+            (dp, *_value(value))
+            for dp, value in (
+                (1, 123456 + i),
+                (101, 41000 + i),
+                (111, 42000 + i),
+                (121, 43000 + i),
+                (9, 750 + i % 50),
+                (131, 12 + i % 3),
+                (132, 500),
+                (133, 215 + i % 5),
+                (134, 0),
+            )
+        ]
+        frames.append((1, 0xEF00, tuya_frame(tsn, phases + values)))
+    return frames
+
+
+def rcbo_frames(count: int) -> list[Frame]:
+    """Bursts of single-DP reports, as sent by a RCBO after each measurement."""
+    frames = []
+    i = 0
+    while len(frames) < count:
+        burst = [
+            (101, 0x00, (2300 + i % 7).to_bytes(2, "big")),
+            (102, 0x00, (1200 + i % 11).to_bytes(3, "big")),
+            (103, 0x00, (2760 + i % 13).to_bytes(3, "big")),
+            (105, *_value(35 + i % 3)),
+            (113, *_value(100000 + i)),
+            (1, 0x01, b"\x01"),
+        ]
+        for datapoint in burst:
+            frames.append((1, 0xEF00, tuya_frame(len(frames) % 256, [datapoint])))
+        i += 1
+    return frames[:count]
+
+
+def ir_frames(count: int, code_length: int = 300, chunk: int = 0x38) -> list[Frame]:
+    """IR learning streams: start frame, code chunks and end frame."""
+    code = bytes((i * 7) % 256 for i in range(code_length))
+    frames = []
+    seq = 0
+    while len(frames) < count:
+        tsn = len(frames) % 256
+        direction = foundation.Direction.Client_to_Server
+        start = (
+            seq.to_bytes(2, "little")
+            + code_length.to_bytes(4, "little")
+            + bytes(4)
+            + (0xE004).to_bytes(2, "little")
+            + b"\x01\x02"
+            + bytes(2)
+        )
+        frames.append((1, 0xED00, zcl_frame(tsn, 0x00, start, direction=direction)))
+        for position in range(0, code_length, chunk):
+            part = code[position : position + chunk]
+            payload = (
+                b"\x00"
+                + seq.to_bytes(2, "little")
+                + position.to_bytes(4, "little")
+                + bytes([len(part)])
+                + part
+                + bytes([sum(part) % 0x100])
+            )
+            frames.append(
+                (1, 0xED00, zcl_frame(tsn, 0x03, payload, direction=direction))
+            )
+        end = seq.to_bytes(2, "little") + bytes(2)
+        frames.append((1, 0xED00, zcl_frame(tsn, 0x05, end, direction=direction)))
+        seq = (seq + 1) % 0x10000
+    return frames[:count]
+
+
+def opple_frames(count: int) -> list[Frame]:
+    """Multistate input press reports of the buttons of a 2 button remote."""
+    frames = []
+    for i in range(count):
+        endpoint_id = 1 + i % 2
+        press = (0, 1, 2, 255)[i % 4]
+        # present_value (0x0055) as uint16_t (0x21)
+        payload = b"\x55\x00\x21" + press.to_bytes(2, "little")
+        frames.append(
+            (
+                endpoint_id,
+                0x0012,
+                zcl_frame(
+                    i % 256,
+                    foundation.GeneralCommand.Report_Attributes,
+                    payload,
+                    general=True,
+                ),
+            )
+        )
+    return frames
+
+
+@dataclasses.dataclass(frozen=True)
+class Scenario:
+    """A quirk and the frames replayed to it."""
+
+    module: str
+    manufacturer: str
+    model: str
+    # v1 CustomDevice class, None for quirks v2 found through the ZHA registry
+    quirk: str | None
+    frames: Callable[[int], list[Frame]]
+
+
+SCENARIOS = {
+    "power": Scenario("ts0601_power", "_TZE200_nslr42tt", "TS0601", None, power_frames),
+    "rcbo": Scenario(
+        "ts0601_rcbo", "_TZE200_hkdl5fmv", "TS0601", "TuyaCircuitBreaker", rcbo_frames
+    ),
+    "ir": Scenario(
+        "ts1201", "_TZ3290_ot6ewjvmejq5ekhl", "TS1201", "ZosungIRBlaster", ir_frames
+    ),
+    "opple": Scenario(
+        "opple_remote",
+        "LUMI",
+        "lumi.remote.b286opcn01",
+        "RemoteB286OPCN01",
+        opple_frames,
+    ),
+}
+
+
+def mock_application() -> mock.MagicMock:
+    """Return an application controller that never touches a radio."""
+    app = mock.MagicMock()
+    app.send_packet = mock.AsyncMock()
+    app.request = mock.AsyncMock(return_value=(foundation.Status.SUCCESS, ""))
+    return app
+
+
+async def _request(*args, **kwargs) -> None:
+    """Outgoing request that completes immediately, without recording calls."""
+
+
+def apply_v2_quirk(device: zigpy.device.Device) -> zigpy.device.Device:
+    """Return a device with the quirk v2 registered for it in ZHA applied.
+
+    Quirks v2 are only in the registry of ZHA, not in the v1 registry behind
+    ``zigpy.quirks.get_device``. Their transforms are applied here, rather than
+    through ``DeviceRegistry.resolve``, so that a failing quirk raises instead
+    of leaving the device unquirked.
+    """
+    entry = ZHA_DEVICE_REGISTRY.match_entry(device)
+    if entry is None:
+        raise LookupError(f"no quirk for {device.manufacturer} {device.model}")
+    for transform in entry.zigpy_transforms:
+        device = transform(device)
+    return device
+
+
+def build_device(app: mock.MagicMock, scenario: Scenario) -> zigpy.device.Device:
+    """Return the quirked device of a scenario."""
+    module = importlib.import_module(f"{PACKAGE}.{scenario.module}")
+    quirk = getattr(module, scenario.quirk) if scenario.quirk else None
+    layout = quirk.signature[ENDPOINTS] if quirk else GENERIC_TS0601
+
+    device = zigpy.device.Device(app, t.EUI64.convert("00:11:22:33:44:55:66:77"), 1)
+    device.manufacturer = scenario.manufacturer
+    device.model = scenario.model
+    for endpoint_id, endpoint_sig in layout.items():
+        endpoint = device.add_endpoint(endpoint_id)
+        endpoint.profile_id = endpoint_sig.get(PROFILE_ID, zha.PROFILE_ID)
+        endpoint.device_type = endpoint_sig.get(DEVICE_TYPE, 0)
+        for cluster_id in endpoint_sig.get(INPUT_CLUSTERS, []):
+            endpoint.add_input_cluster(cluster_id)
+        for cluster_id in endpoint_sig.get(OUTPUT_CLUSTERS, []):
+            endpoint.add_output_cluster(cluster_id)
+
+    if quirk is not None:
+        device = quirk(app, device.ieee, device.nwk, device)
+    else:
+        device = apply_v2_quirk(device)
+
+    device.request = _request
+    return device
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Return a percentile of sorted values, nearest rank."""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def replay(
+    device: zigpy.device.Device, frames: list[Frame], trace_memory: bool
+) -> dict[str, float]:
+    """Feed the frames to the device clusters and measure them."""
+    clusters = {
+        (endpoint_id, cluster_id): device.endpoints[endpoint_id].in_clusters[cluster_id]
+        for endpoint_id, cluster_id, _ in frames
+    }
+    latencies = []
+    allocated = 0
+    perf_counter_ns = time.perf_counter_ns
+
+    # warm up caches and lazily built state
+    for endpoint_id, cluster_id, data in frames[:50]:
+        cluster = clusters[(endpoint_id, cluster_id)]
+        cluster.handle_message(*cluster.deserialize(data))
+    await asyncio.sleep(0)
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    for endpoint_id, cluster_id, data in frames:
+        cluster = clusters[(endpoint_id, cluster_id)]
+        if trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        frame_start = perf_counter_ns()
+        hdr, args = cluster.deserialize(data)
+        cluster.handle_message(hdr, args)
+        latencies.append(perf_counter_ns() - frame_start)
+        if trace_memory:
+            allocated += tracemalloc.get_traced_memory()[1] - before
+        # run the tasks created for the frame, e.g. default responses
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks
+
+    latencies.sort()
+    return {
+        "frames": len(frames),
+        "fps": len(frames) / elapsed,
+        "p50_us": percentile(latencies, 0.50) / 1e3,
+        "p90_us": percentile(latencies, 0.90) / 1e3,
+        "p99_us": percentile(latencies, 0.99) / 1e3,
+        "mean_us": statistics.fmean(latencies) / 1e3,
+        "alloc_bytes": allocated / len(frames) if trace_memory else float("nan"),
+        "retained_blocks": retained / len(frames),
+    }
+
+
+def load_recorded(path: pathlib.Path) -> dict[str, list[Frame]]:
+    """Load recorded frames from a JSON file."""
+    recorded = json.loads(path.read_text())
+    return {
+        name: [
+            (endpoint_id, cluster_id, bytes.fromhex(data))
+            for endpoint_id, cluster_id, data in frames
+        ]
+        for name, frames in recorded.items()
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the selected scenarios."""
+    # the vendored modules, without running their ``__init__`` again
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(QUIRKS_DIR)]
+    sys.modules[PACKAGE] = package
+
+    recorded = load_recorded(args.recorded) if args.recorded else {}
+    app = mock_application()
+
+    print(
+        f"{'scenario':<8} {'frames':>7} {'frames/s':>10} {'p50 us':>8} "
+        f"{'p90 us':>8} {'p99 us':>8} {'B/frame':>8} {'kept/frame':>10}"
+    )
+    for name in args.scenario or SCENARIOS:
+        scenario = SCENARIOS[name]
+        device = build_device(app, scenario)
+        frames = recorded.get(name) or scenario.frames(args.frames)
+        timing = await replay(device, frames, trace_memory=False)
+        tracemalloc.start()
+        try:
+            memory = await replay(device, frames, trace_memory=True)
+        finally:
+            tracemalloc.stop()
+
+        print(
+            f"{name:<8} {timing['frames']:7d} {timing['fps']:10.0f} "
+            f"{timing['p50_us']:8.1f} {timing['p90_us']:8.1f} "
+            f"{timing['p99_us']:8.1f} {memory['alloc_bytes']:8.0f} "
+            f"{timing['retained_blocks']:10.2f}"
+        )
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="default: all"
+    )
+    parser.add_argument("--recorded", type=pathlib.Path)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
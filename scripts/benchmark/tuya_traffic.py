@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""Synthetic Tuya MCU traffic load test of the vendored quirks.
+
+Builds virtual devices for the quirks of ``.github/cache/zha`` listed in
+``quirk_manifest.json`` that have a Tuya MCU cluster, synthesizes valid Tuya
+datapoint reports for them and pushes the frames through the quirk clusters,
+offline, reporting throughput and latency per quirk family (module).
+
+The datapoints of a family are the ones its quirk handles: the
+``dp_to_attribute`` datapoints of ``TuyaNewManufCluster`` quirks, with the
+types listed in ``data/dp_database.json``, and the attributes of
+``TuyaManufClusterAttributes`` quirks, whose ids hold the datapoint type.
+Each candidate type is checked against the quirk once before the run, the
+first one it accepts is used. The datapoints ``data/dp_registry.json`` lists
+for the manufacturer that the quirk doesn't handle are reported as well, as
+real devices do.
+
+Every virtual device reports a random datapoint every ``--interval`` seconds
+on average, a report is a burst of ``--burst-size`` single datapoint frames
+with probability ``--burst-probability``. Frames are streamed in virtual time
+order from a generator, and processed as fast as possible.
+
+Requires ``zigpy`` and ``zhaquirks`` (with ``.github/cache/zha`` as
+``zhaquirks.tuya``) to be importable::
+
+    python scripts/benchmark/tuya_traffic.py --devices 2000 --duration 600
+    python scripts/benchmark/tuya_traffic.py --family ts0601_rcbo --interval 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Iterator
+import dataclasses
+import heapq
+import importlib
+import json
+import pathlib
+import random
+import statistics
+import sys
+import time
+import types
+
+from tuya_replay import (
+    GENERIC_TS0601,
+    PACKAGE,
+    QUIRKS_DIR,
+    apply_v2_quirk,
+    mock_application,
+    percentile,
+    tuya_frame,
+)
+from zigpy.profiles import zha
+import zigpy.device
+import zigpy.quirks
+import zigpy.types as t
+
+from zhaquirks.const import (
+    DEVICE_TYPE,
+    ENDPOINTS,
+    INPUT_CLUSTERS,
+    MODELS_INFO,
+    OUTPUT_CLUSTERS,
+    PROFILE_ID,
+)
+from zhaquirks.tuya import (
+    TUYA_CLUSTER_ID,
+    TuyaDPType,
+    TuyaManufClusterAttributes,
+    TuyaNewManufCluster,
+)
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+DP_DATABASE = ROOT / "data" / "dp_database.json"
+DP_REGISTRY = ROOT / "data" / "dp_registry.json"
+
+# data types of data/dp_database.json
+DATA_TYPES = {
+    "bool": TuyaDPType.BOOL,
+    "binary": TuyaDPType.BOOL,
+    "trueFalse1": TuyaDPType.BOOL,
+    "value": TuyaDPType.VALUE,
+    "int16s": TuyaDPType.VALUE,
+    "int32s": TuyaDPType.VALUE,
+    "uint8_t": TuyaDPType.VALUE,
+    "divideBy10": TuyaDPType.VALUE,
+    "divideBy100": TuyaDPType.VALUE,
+    "enum": TuyaDPType.ENUM,
+    "raw": TuyaDPType.RAW,
+    "string": TuyaDPType.STRING,
+    "bitmap": TuyaDPType.BITMAP,
+}
+DEFAULT_TYPES = (TuyaDPType.VALUE, TuyaDPType.BOOL, TuyaDPType.ENUM, TuyaDPType.RAW)
+# lengths tried for raw datapoints
+RAW_LENGTHS = (8, 4, 3, 2, 1, 12, 16, 18)
+
+
+@dataclasses.dataclass(frozen=True)
+class Datapoint:
+    """A datapoint reported by the devices of a family."""
+
+    dp: int
+    dp_type: TuyaDPType
+    length: int
+    known: bool
+
+
+@dataclasses.dataclass
+class Family:
+    """The virtual devices of a quirk module and their datapoints."""
+
+    name: str
+    manufacturer: str
+    model: str
+    quirk: type | None
+    datapoints: list[Datapoint] = dataclasses.field(default_factory=list)
+    devices: list[tuple[zigpy.device.Device, object]] = dataclasses.field(
+        default_factory=list
+    )
+
+
+def load_knowledge() -> tuple[dict[int, list[TuyaDPType]], dict[str, set[int]]]:
+    """Return the datapoint types and the datapoints of each manufacturer."""
+    types_by_dp = {}
+    for dp, info in json.loads(DP_DATABASE.read_text()).items():
+        dp_types = []
+        for name in info.get("dataTypes", []):
+            dp_type = DATA_TYPES.get(name)
+            if dp_type is not None and dp_type not in dp_types:
+                dp_types.append(dp_type)
+        types_by_dp[int(dp)] = dp_types
+
+    registry = json.loads(DP_REGISTRY.read_text())
+    dps_by_manufacturer = {
+        manufacturer: {entry["dpId"] for entry in entries}
+        for manufacturer, entries in registry["byMfr"].items()
+    }
+    return types_by_dp, dps_by_manufacturer
+
+
+def family_devices() -> dict[str, tuple[str, str]]:
+    """Return a (manufacturer, model) quirked by each module of the manifest."""
+    manifest = json.loads((QUIRKS_DIR / "quirk_manifest.json").read_text())
+    pairs: dict[str, tuple[str, str]] = {}
+    for model, by_manufacturer in sorted(manifest["models"].items()):
+        for manufacturer, modules in sorted(by_manufacturer.items()):
+            if manufacturer == "*":
+                continue
+            for module in modules:
+                # prefer the TS0601 entries of a module, the MCU devices
+                if module not in pairs or (
+                    model == "TS0601" and pairs[module][1] != "TS0601"
+                ):
+                    pairs[module] = (manufacturer, model)
+    return pairs
+
+
+def v1_quirk(module: types.ModuleType, manufacturer: str, model: str) -> type | None:
+    """Return the v1 quirk of a module for the manufacturer and model."""
+    for quirk in vars(module).values():
+        if (
+            isinstance(quirk, type)
+            and issubclass(quirk, zigpy.quirks.CustomDevice)
+            and quirk.__module__ == module.__name__
+            and (manufacturer, model) in quirk.signature.get(MODELS_INFO, ())
+        ):
+            return quirk
+    return None
+
+
+def build_device(app, family: Family, index: int) -> zigpy.device.Device:
+    """Return a virtual device of a family."""
+    layout = family.quirk.signature[ENDPOINTS] if family.quirk else GENERIC_TS0601
+    ieee = t.EUI64((index + 1).to_bytes(8, "little"))
+    device = zigpy.device.Device(app, ieee, index % 0xFFF0 + 1)
+    device.manufacturer = family.manufacturer
+    device.model = family.model
+    for endpoint_id, endpoint_sig in layout.items():
+        endpoint = device.add_endpoint(endpoint_id)
+        endpoint.profile_id = endpoint_sig.get(PROFILE_ID, zha.PROFILE_ID)
+        endpoint.device_type = endpoint_sig.get(DEVICE_TYPE, 0)
+        for cluster_id in endpoint_sig.get(INPUT_CLUSTERS, []):
+            endpoint.add_input_cluster(cluster_id)
+        for cluster_id in endpoint_sig.get(OUTPUT_CLUSTERS, []):
+            endpoint.add_output_cluster(cluster_id)
+
+    if family.quirk is not None:
+        device = family.quirk(app, device.ieee, device.nwk, device)
+    else:
+        device = apply_v2_quirk(device)
+
+    device.request = _request
+    return device
+
+
+async def _request(*args, **kwargs) -> None:
+    """Outgoing request that completes immediately."""
+
+
+def mcu_cluster(device: zigpy.device.Device):
+    """Return the Tuya MCU cluster of a device, None if it has none."""
+    for endpoint_id, endpoint in device.endpoints.items():
+        if endpoint_id == 0:
+            continue
+        cluster = endpoint.in_clusters.get(TUYA_CLUSTER_ID)
+        if isinstance(cluster, (TuyaNewManufCluster, TuyaManufClusterAttributes)):
+            return cluster
+    return None
+
+
+def sample(rng: random.Random, dp_type: TuyaDPType, length: int) -> bytes:
+    """Return a random value of a datapoint type."""
+    if dp_type == TuyaDPType.BOOL:
+        return bytes([rng.randrange(2)])
+    if dp_type == TuyaDPType.VALUE:
+        return rng.randrange(1000).to_bytes(4, "big")
+    if dp_type == TuyaDPType.ENUM:
+        return bytes([rng.randrange(2)])
+    if dp_type == TuyaDPType.BITMAP:
+        return bytes([rng.randrange(256)])
+    if dp_type == TuyaDPType.STRING:
+        return b"synthetic"[:length]
+    return rng.randbytes(length)
+
+
+def accepts(cluster, dp: int, dp_type: TuyaDPType, length: int) -> bool:
+    """Return True if a cluster handles a report of the datapoint type."""
+    data = tuya_frame(0, [(dp, dp_type, sample(random.Random(dp), dp_type, length))])
+    try:
+        cluster.handle_message(*cluster.deserialize(data))
+    except Exception:  # noqa: BLE001
+        return False
+    return True
+
+
+def candidates(dp_types) -> Iterator[tuple[TuyaDPType, int]]:
+    """Return the (type, length) pairs tried for a datapoint."""
+    for dp_type in dp_types:
+        if dp_type == TuyaDPType.RAW:
+            yield from ((dp_type, length) for length in RAW_LENGTHS)
+        elif dp_type == TuyaDPType.VALUE:
+            yield dp_type, 4
+        elif dp_type == TuyaDPType.STRING:
+            yield dp_type, len(b"synthetic")
+        else:
+            yield dp_type, 1
+
+
+def datapoints(
+    cluster,
+    manufacturer: str,
+    types_by_dp: dict[int, list[TuyaDPType]],
+    dps_by_manufacturer: dict[str, set[int]],
+) -> list[Datapoint]:
+    """Return the datapoints reported by the devices of a family."""
+    if isinstance(cluster, TuyaManufClusterAttributes):
+        handled = {
+            attrid & 0xFF: [TuyaDPType(attrid >> 8)]
+            for attrid in cluster.attributes
+            if attrid >> 8 in TuyaDPType._value2member_map_
+        }
+    else:
+        handled = {
+            dp: types_by_dp.get(dp) or list(DEFAULT_TYPES)
+            for dp in cluster._dp_handlers
+        }
+
+    result = []
+    for dp, dp_types in sorted(handled.items()):
+        for dp_type, length in candidates(dp_types):
+            if accepts(cluster, dp, dp_type, length):
+                result.append(Datapoint(dp, dp_type, length, known=True))
+                break
+    for dp in sorted(dps_by_manufacturer.get(manufacturer, set()) - set(handled)):
+        dp_type, length = next(candidates(types_by_dp.get(dp) or DEFAULT_TYPES))
+        result.append(Datapoint(dp, dp_type, length, known=False))
+    return result
+
+
+def traffic(
+    families: list[Family],
+    duration: float,
+    interval: float,
+    burst_probability: float,
+    burst_size: int,
+    seed: int = 0,
+) -> Iterator[tuple[float, Family, object, bytes, bool]]:
+    """Yield the (time, family, cluster, frame, known) reports, in time order."""
+    rng = random.Random(seed)
+    devices = [
+        (family, cluster)
+        for family in families
+        for _, cluster in family.devices
+        if family.datapoints
+    ]
+    tsns = [0] * len(devices)
+    schedule = [(rng.expovariate(1 / interval), index) for index in range(len(devices))]
+    heapq.heapify(schedule)
+
+    while schedule:
+        now, index = heapq.heappop(schedule)
+        if now > duration:
+            break
+        family, cluster = devices[index]
+        size = burst_size if rng.random() < burst_probability else 1
+        for datapoint in rng.choices(family.datapoints, k=size):
+            tsns[index] = (tsns[index] + 1) % 256
+            data = tuya_frame(
+                tsns[index],
+                [
+                    (
+                        datapoint.dp,
+                        datapoint.dp_type,
+                        sample(rng, datapoint.dp_type, datapoint.length),
+                    )
+                ],
+            )
+            yield now, family, cluster, data, datapoint.known
+        heapq.heappush(schedule, (now + rng.expovariate(1 / interval), index))
+
+
+def setup(args: argparse.Namespace) -> list[Family]:
+    """Build the families and their virtual devices."""
+    # the vendored modules, without running their ``__init__`` again
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(QUIRKS_DIR)]
+    sys.modules[PACKAGE] = package
+
+    types_by_dp, dps_by_manufacturer = load_knowledge()
+    app = mock_application()
+    families = []
+    for name, (manufacturer, model) in sorted(family_devices().items()):
+        if args.family and name not in args.family:
+            continue
+        module = importlib.import_module(f"{PACKAGE}.{name}")
+        family = Family(
+            name, manufacturer, model, v1_quirk(module, manufacturer, model)
+        )
+        probe = build_device(app, family, 0)
+        cluster = mcu_cluster(probe)
+        if cluster is None:
+            continue
+        family.datapoints = datapoints(
+            cluster, manufacturer, types_by_dp, dps_by_manufacturer
+        )
+        families.append(family)
+
+    for index in range(args.devices):
+        family = families[index % len(families)]
+        device = build_device(app, family, index + 1)
+        family.devices.append((device, mcu_cluster(device)))
+    return families
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the load test."""
+    families = setup(args)
+    stats = {
+        family.name: {"frames": 0, "unknown": 0, "errors": 0, "latencies": []}
+        for family in families
+    }
+    perf_counter_ns = time.perf_counter_ns
+
+    start = time.perf_counter()
+    for count, (_, family, cluster, data, known) in enumerate(
+        traffic(
+            families,
+            args.duration,
+            args.interval,
+            args.burst_probability,
+            args.burst_size,
+        )
+    ):
+        family_stats = stats[family.name]
+        frame_start = perf_counter_ns()
+        try:
+            cluster.handle_message(*cluster.deserialize(data))
+        except Exception:  # noqa: BLE001
+            family_stats["errors"] += 1
+        family_stats["latencies"].append(perf_counter_ns() - frame_start)
+        family_stats["frames"] += 1
+        family_stats["unknown"] += not known
+        if count % 100 == 0:
+            # run the tasks created for the frames, e.g. default responses
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{'family':<28} {'devices':>7} {'dps':>4} {'frames':>8} {'unknown':>8} "
+        f"{'errors':>7} {'frames/s':>9} {'p50 us':>8} {'p99 us':>8}"
+    )
+    total = 0
+    for family in families:
+        family_stats = stats[family.name]
+        latencies = sorted(family_stats["latencies"])
+        total += len(latencies)
+        if not latencies:
+            continue
+        print(
+            f"{family.name:<28} {len(family.devices):7d} "
+            f"{len(family.datapoints):4d} {family_stats['frames']:8d} "
+            f"{family_stats['unknown']:8d} {family_stats['errors']:7d} "
+            f"{1e9 / statistics.fmean(latencies):9.0f} "
+            f"{percentile(latencies, 0.50) / 1e3:8.1f} "
+            f"{percentile(latencies, 0.99) / 1e3:8.1f}"
+        )
+    print(
+        f"{total} frames of {args.duration:.0f} virtual seconds "
+        f"in {elapsed:.2f} s: {total / elapsed:.0f} frames/s"
+    )
+
+
+def main() -> None:
+    """Parse the arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument(
+        "--duration", type=float, default=300, help="virtual seconds of traffic"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=60, help="mean seconds between reports"
+    )
+    parser.add_argument("--burst-probability", type=float, default=0.1)
+    parser.add_argument("--burst-size", type=int, default=6)
+    parser.add_argument("--family", action="append", help="quirk module, default: all")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
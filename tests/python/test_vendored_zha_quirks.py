@@ -0,0 +1,165 @@
+"""Smoke tests of the vendored ZHA quirks of ``.github/cache/zha``.
+
+Need ``zigpy`` and ``zhaquirks``, with ``.github/cache/zha/__init__.py``
+importable as ``zhaquirks.tuya``::
+
+    python -m pytest tests/python
+
+Quirk modules needing a dependency missing from the environment, such as
+a ``zhaquirks`` release without ``zhaquirks.builder``, are skipped. Errors
+raised by the vendored code itself fail.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import pathlib
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("zigpy")
+pytest.importorskip("zhaquirks")
+
+QUIRKS_DIR = pathlib.Path(__file__).resolve().parents[2] / ".github" / "cache" / "zha"
+PACKAGE = "vendored_quirks"
+VENDORED = {"zhaquirks.tuya", PACKAGE}
+MODULES = sorted(
+    path.stem for path in QUIRKS_DIR.glob("*.py") if path.stem != "__init__"
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def vendored_package():
+    """Make the quirk modules importable as submodules of `PACKAGE`."""
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(QUIRKS_DIR)]
+    sys.modules[PACKAGE] = package
+    yield package
+    for name in [name for name in sys.modules if name.startswith(f"{PACKAGE}.")]:
+        del sys.modules[name]
+    del sys.modules[PACKAGE]
+
+
+def import_quirk(name: str) -> types.ModuleType:
+    """Import a vendored quirk module, skipping if a dependency is missing."""
+    try:
+        return importlib.import_module(f"{PACKAGE}.{name}")
+    except ImportError as exc:
+        module = exc.name or ""
+        if module in VENDORED or module.startswith(f"{PACKAGE}."):
+            raise
+        pytest.skip(f"{exc}")
+
+
+@pytest.mark.parametrize("name", MODULES)
+def test_import(name: str) -> None:
+    """Every vendored quirk module imports."""
+    import_quirk(name)
+
+
+def test_rcbo_report_policies() -> None:
+    """Report policies reach the mappings of the MCU cluster of the RCBO."""
+    rcbo = import_quirk("ts0601_rcbo")
+    dp_to_attribute = rcbo.TuyaRCBOManufCluster.dp_to_attribute
+
+    assert dp_to_attribute[rcbo.TUYA_DP_VOLTAGE].report_policy is (
+        rcbo.VOLTAGE_REPORT_POLICY
+    )
+    assert dp_to_attribute[rcbo.TUYA_DP_CURRENT].report_policy is (
+        rcbo.CURRENT_REPORT_POLICY
+    )
+    assert dp_to_attribute[rcbo.TUYA_DP_ACTIVE_POWER].report_policy is (
+        rcbo.POWER_REPORT_POLICY
+    )
+
+
+def test_write_queue_coalesces_by_key() -> None:
+    """Writes coalesce per namespaced key and share the result of the last."""
+    tuya = importlib.import_module("zhaquirks.tuya")
+
+    class Cluster:
+        def create_catching_task(self, coro):
+            return asyncio.ensure_future(coro)
+
+    async def write_all():
+        queue = tuya.TuyaWriteQueue()
+        cluster = Cluster()
+        first = queue.write(cluster, ("dp", (1,)), lambda: asyncio.sleep(0, "old"))
+        last = queue.write(cluster, ("dp", (1,)), lambda: asyncio.sleep(0, "new"))
+        legacy = queue.write(cluster, ("command", 1), lambda: asyncio.sleep(0, "cmd"))
+        assert queue.pending == 2
+        return await first, await last, await legacy, queue
+
+    first, last, legacy, queue = asyncio.run(write_all())
+
+    assert (first, last, legacy) == ("new", "new", "cmd")
+    assert (queue.coalesced, queue.sent) == (1, 2)
+
+
+def test_pack_datapoints() -> None:
+    """Datapoints are packed in as few batches as fit in the budget."""
+    tuya = importlib.import_module("zhaquirks.tuya")
+    datapoints = [tuya.TuyaDatapointData(dp, tuya.TuyaData(True)) for dp in range(1, 6)]
+
+    # each boolean record takes 5 bytes
+    batches = tuya.pack_datapoints(datapoints, 10)
+
+    assert [[datapoint.dp for datapoint in batch] for batch in batches] == [
+        [1, 2],
+        [3, 4],
+        [5],
+    ]
+
+
+def test_packed_converter() -> None:
+    """Packed fields decode in declaration order, whatever their offsets."""
+    tuya = importlib.import_module("zhaquirks.tuya")
+    data = bytes([0xFF, 0xFE, 0x02, 0x01, 0x00, 0x64])
+
+    convert = tuya.packed_converter(
+        tuya.PackedField("trip", offset=3),
+        tuya.PackedField("threshold", offset=0, width=3, signed=True),
+        tuya.PackedField("power", offset=4, width=2, scale=0.5, type=int),
+    )
+    assert convert(data) == (1, -510, 50)
+
+    little = tuya.packed_converter(
+        tuya.PackedField("threshold", offset=0, width=3), byteorder="little"
+    )
+    assert little(data) == 0x02FEFF
+
+    summed = tuya.packed_converter(
+        tuya.PackedField("high", offset=2),
+        tuya.PackedField("low", offset=3),
+        result=lambda high, low: high * 10 + low,
+    )
+    assert summed(data) == 21
+
+
+def test_default_response_acknowledge() -> None:
+    """Only ALWAYS answers frames with SUCCESS before they are handled."""
+    tuya = importlib.import_module("zhaquirks.tuya")
+    foundation = importlib.import_module("zigpy.zcl.foundation")
+    sent = []
+    cluster = types.SimpleNamespace(
+        endpoint=types.SimpleNamespace(
+            device=types.SimpleNamespace(model="TS0601", tuya_default_response=None)
+        ),
+        send_default_rsp=lambda hdr, status: sent.append(status),
+    )
+    hdr = foundation.ZCLHeader.cluster(1, 0x02)
+
+    cluster.endpoint.device.tuya_default_response = tuya.TuyaDefaultResponse.ALWAYS
+    assert tuya.TuyaDefaultResponsePolicy.acknowledge(cluster, hdr)
+    assert sent == [foundation.Status.SUCCESS]
+
+    cluster.endpoint.device.tuya_default_response = tuya.TuyaDefaultResponse.ON_ERROR
+    assert not tuya.TuyaDefaultResponsePolicy.acknowledge(cluster, hdr)
+    tuya.TuyaDefaultResponsePolicy.respond(cluster, hdr)
+    tuya.TuyaDefaultResponsePolicy.respond(
+        cluster, hdr, foundation.Status.UNSUPPORTED_ATTRIBUTE
+    )
+    assert sent == [foundation.Status.SUCCESS, foundation.Status.UNSUPPORTED_ATTRIBUTE]